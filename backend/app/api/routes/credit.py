@@ -1,5 +1,6 @@
 # app/api/routes/credit.py - UPDATED WITH CREDIT CARD MANAGEMENT
 from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 
 from app.models.user import User
@@ -12,6 +13,7 @@ from app.schemas.credit import (
 )
 from app.services.credit_service import CreditService
 from app.api.dependencies import get_current_user
+from app.utils.sse import SSE_HEADERS
 
 router = APIRouter(prefix="/credit", tags=["credit-score"])
 
@@ -302,6 +304,19 @@ async def generate_personalized_tips(
         print(f"Error generating credit tips: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/generate-tips/stream")
+async def stream_personalized_tips(
+    request: Request,
+    tip_request: CreditScoreTipRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """Stream the AI credit plan as server-sent events, ending with the full analysis"""
+    return StreamingResponse(
+        CreditService.stream_comprehensive_analysis(current_user.clerk_user_id, tip_request),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
 @router.post("/bulk-update-balances")
 async def bulk_update_card_balances(
     request: Request,
@@ -57,7 +57,7 @@ async def summarize_documents(
     start_time = time.time()
     
     try:
-        summary = await document_service.summarize_documents(files)
+        summary = await document_service.summarize_documents(files, current_user.clerk_user_id)
         processing_time = time.time() - start_time
         
         return {
@@ -132,7 +132,8 @@ async def analyze_documents(
         analysis_result = await document_service.analyze_documents(
             files=files,
             analysis_type=analysis_type,
-            focus_areas=focus_areas_list
+            focus_areas=focus_areas_list,
+            clerk_user_id=current_user.clerk_user_id
         )
         
         # Add user context to response
@@ -53,11 +53,14 @@
 
 # app/api/routes/education.py
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from typing import Dict, Any, List, Optional
 from pydantic import BaseModel
 from app.api.dependencies import get_current_user
 from app.models.user import User
 from app.services.education_service import EducationService
+from app.services.rag_service import RAGService, kb_index_handle
+from app.utils.sse import SSE_HEADERS
 
 router = APIRouter(prefix="/education", tags=["education"])
 
@@ -84,6 +87,41 @@ async def chat_with_education_bot(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
+@router.post("/chat/stream")
+async def stream_chat_with_education_bot(
+    request: ChatMessage,
+    clerk_user_id: str = Depends(get_clerk_user_id)
+):
+    """Same as /chat, but streams the answer as server-sent events ("token" events, then "done")"""
+    return StreamingResponse(
+        EducationService.stream_financial_education_response(
+            user_question=request.message,
+            clerk_user_id=clerk_user_id,
+            conversation_history=request.conversation_history
+        ),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
+
+class RAGQuestion(BaseModel):
+    question: str
+    k: Optional[int] = None
+
+@router.post("/rag")
+async def answer_from_knowledge_base(
+    request: RAGQuestion,
+    clerk_user_id: str = Depends(get_clerk_user_id)
+) -> Dict[str, Any]:
+    """Answer grounded in the education knowledge base, with the sources it was built from"""
+    if not kb_index_handle.loaded:
+        raise HTTPException(status_code=503, detail="Knowledge base index is not available")
+    try:
+        return await RAGService.answer_question(request.question, request.k)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
 @router.get("/suggested-topics")
 async def get_suggested_topics() -> Dict[str, Any]:
     try:
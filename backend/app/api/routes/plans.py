@@ -1,11 +1,14 @@
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from typing import Dict, Any
+from fastapi.responses import StreamingResponse
+from typing import Dict, Any, Optional
 from app.models.user import User
 from app.schemas.plan import (
     RepaymentPlanRequest, RepaymentPlanResponse, 
     StrategyComparisonResponse
 )
 from app.services.plan_service import PlanService
+from app.services.strategy_executor import ExecutorSaturatedError
 from app.api.dependencies import get_current_user
 
 router = APIRouter(prefix="/plans", tags=["repayment-plans"])
@@ -25,17 +28,19 @@ async def get_debt_summary(
             detail=f"Failed to get debt summary: {str(e)}"
         )
 
-@router.post("/generate", response_model=RepaymentPlanResponse)
+@router.post("/generate", response_model=RepaymentPlanResponse, response_model_exclude_none=True)
 async def generate_repayment_plan(
     request: Request,
     plan_request: RepaymentPlanRequest,
+    fields: Optional[str] = None,
     current_user: User = Depends(get_current_user)
 ):
     """Generate optimized repayment plan using user's actual debt data"""
     try:
         plan = await PlanService.generate_repayment_plan(
             current_user.clerk_user_id, 
-            plan_request
+            plan_request,
+            PlanService.parse_fields(fields)
         )
         return plan
     except ValueError as e:
@@ -43,20 +48,61 @@ async def generate_repayment_plan(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except ExecutorSaturatedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Plan computation timed out"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to generate repayment plan: {str(e)}"
         )
 
-@router.post("/compare", response_model=StrategyComparisonResponse)
+@router.post("/generate/stream")
+async def stream_repayment_plan(
+    request: Request,
+    plan_request: RepaymentPlanRequest,
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Stream the repayment plan as NDJSON, one line per month as it is simulated"""
+    try:
+        lines = await PlanService.stream_repayment_plan(
+            current_user.clerk_user_id,
+            plan_request,
+            PlanService.parse_fields(fields)
+        )
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to stream repayment plan: {str(e)}"
+        )
+
+@router.post("/compare", response_model=StrategyComparisonResponse, response_model_exclude_none=True)
 async def compare_strategies(
     request: Request,
     monthly_budget: float,
     max_months: int = 60,
+    fields: Optional[str] = None,
     current_user: User = Depends(get_current_user)
 ):
-    """Compare all repayment strategies for user's debts"""
+    """
+    Compare all repayment strategies for user's debts.
+    "optimal" is always the same schedule as "avalanche": paying the highest rate first is the
+    exact interest-minimizing allocation. It is kept as its own field for API compatibility.
+    """
     try:
         if monthly_budget <= 0:
             raise HTTPException(
@@ -67,7 +113,8 @@ async def compare_strategies(
         comparison = await PlanService.compare_all_strategies(
             current_user.clerk_user_id,
             monthly_budget,
-            max_months
+            max_months,
+            PlanService.parse_fields(fields)
         )
         return comparison
     except ValueError as e:
@@ -75,6 +122,16 @@ async def compare_strategies(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except ExecutorSaturatedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Plan computation timed out"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,7 +1,12 @@
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from app.models.user import User
-from app.schemas.scenario import WhatIfRequest, ScenarioComparison
+from app.schemas.scenario import (
+    WhatIfRequest, ScenarioComparison, SweepRequest, SweepResponse,
+    MonteCarloRequest, MonteCarloResponse
+)
 from app.services.scenario_service import ScenarioService
+from app.services.strategy_executor import ExecutorSaturatedError
 from app.api.dependencies import get_current_user
 
 router = APIRouter(prefix="/scenarios", tags=["what-if-scenarios"])
@@ -31,9 +36,87 @@ async def run_what_if_analysis(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except ExecutorSaturatedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Plan computation timed out"
+        )
     except Exception as e:
         print(f"Error in what-if analysis: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to run what-if analysis: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.post("/sweep", response_model=SweepResponse)
+async def run_sensitivity_sweep(
+    request: Request,
+    sweep_request: SweepRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """Months to debt-free and total interest across a grid of budgets or extra payments"""
+    try:
+        return await ScenarioService.run_sensitivity_sweep(
+            current_user.clerk_user_id,
+            sweep_request
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except ExecutorSaturatedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Plan computation timed out"
+        )
+    except Exception as e:
+        print(f"Error in sensitivity sweep: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to run sensitivity sweep: {str(e)}"
+        )
+
+@router.post("/monte-carlo", response_model=MonteCarloResponse)
+async def run_monte_carlo(
+    request: Request,
+    mc_request: MonteCarloRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """P10/P50/P90 payoff month and total interest over randomly shocked repayment paths"""
+    try:
+        return await ScenarioService.run_monte_carlo(
+            current_user.clerk_user_id,
+            mc_request
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except ExecutorSaturatedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Plan computation timed out"
+        )
+    except Exception as e:
+        print(f"Error in Monte Carlo analysis: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to run Monte Carlo analysis: {str(e)}"
+        )
@@ -30,6 +30,9 @@ from app.config.settings import settings
 from app.models.user import User
 from app.models.debt import Debt
 from app.models.credit_profile import CreditProfile  # Add this import
+from app.models.plan import Plan
+from app.models.plan_cache import PlanCacheEntry
+from app.models.chat import ChatMessage
 
 client = None
 database = None
@@ -41,7 +44,7 @@ async def init_database():
     
     await init_beanie(
         database=database,
-        document_models=[User, Debt, CreditProfile]  # Add CreditProfile here
+        document_models=[User, Debt, CreditProfile, Plan, PlanCacheEntry, ChatMessage]
     )
     print(f"Database initialized: {settings.DATABASE_NAME}")
 
@@ -18,8 +18,63 @@ class Settings(BaseSettings):
 
     OLLAMA_BASE_URL: str = "http://localhost:11434"
     EMBEDDING_MODEL: str = "nomic-embed-text"
+    EMBEDDING_TIMEOUT_SECONDS: float = 30.0
     llm_model: str = "llama-3.3-70b-versatile"  # Added this field
     
+    # Shared LLM HTTP client
+    LLM_BASE_URL: str = "https://api.groq.com/openai/v1"
+    LLM_TIMEOUT_SECONDS: float = 30.0
+    LLM_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    LLM_MAX_CONNECTIONS: int = 20
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    LLM_KEEPALIVE_EXPIRY_SECONDS: float = 60.0
+    LLM_HTTP2: bool = True
+    LLM_MAX_RETRIES: int = 2
+    LLM_RETRY_BACKOFF_SECONDS: float = 0.5
+    LLM_RETRY_BACKOFF_MAX_SECONDS: float = 8.0
+    
+    # LLM response cache (semantic tier needs the Ollama embedding model)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_TTL_SECONDS: int = 3600
+    LLM_CACHE_MAX_ENTRIES: int = 2048
+    LLM_SEMANTIC_CACHE_ENABLED: bool = False
+    LLM_SEMANTIC_CACHE_MAX_ENTRIES: int = 512
+    LLM_SEMANTIC_CACHE_THRESHOLD: float = 0.92
+    
+    # Education RAG (index built by build_kb_index.py)
+    KB_DIR: str = "kb"
+    KB_INDEX_DIR: str = "kb_index"
+    KB_EMBEDDING_CACHE: str = "kb_embedding_cache.sqlite"
+    KB_EMBED_BATCH_SIZE: int = 64
+    KB_EMBED_CONCURRENCY: int = 4
+    KB_INDEX_TYPE: str = "flat"  # flat | sq8 | ivf | ivf_sq8 | ivf_pq, all memory-mapped and shared between workers
+    KB_IVF_NLIST: int = 0  # 0 picks nlist from the index size
+    KB_PQ_M: int = 0  # 0 picks pq_m from the embedding dimension
+    RAG_TOP_K: int = 3
+    RAG_MAX_TOP_K: int = 10
+    RAG_IVF_NPROBE: int = 16  # IVF lists probed per query when build_kb_index.py built an IVF index
+    RAG_CANDIDATES: int = 20  # per retriever (FAISS and BM25) before fusion
+    RAG_RERANKER_MODEL: str = ""  # e.g. cross-encoder/ms-marco-MiniLM-L-6-v2; needs sentence-transformers
+    RAG_MAX_CONTEXT_CHARS: int = 2400
+    RAG_MAX_TOKENS: int = 600
+    
+    # Document summarization (map-reduce)
+    DOC_SUMMARY_CONCURRENCY: int = 4
+    DOC_SUMMARY_REDUCE_MAX_CHARS: int = 12000
+    
+    # Plan cache
+    PLAN_CACHE_TTL_SECONDS: int = 600
+    PLAN_CACHE_MAX_ENTRIES: int = 1024
+    PLAN_CACHE_MONGO_ENABLED: bool = False
+    PLAN_EVENT_ENGINE: bool = True  # summary-only plans jump between payoff events (core/event_engine.py)
+    
+    # Strategy executor ("process" or "thread")
+    STRATEGY_EXECUTOR_KIND: str = "process"
+    STRATEGY_EXECUTOR_WORKERS: int = 2
+    STRATEGY_EXECUTOR_MAX_PENDING: int = 32
+    STRATEGY_TIMEOUT_SECONDS: float = 15.0
+    MONTE_CARLO_CHUNK_PATHS: int = 2500
+    
     # Security
     SECRET_KEY: str = "test-secret-key-change-in-production"
     JWT_ALGORITHM: str = "RS256"
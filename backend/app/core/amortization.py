@@ -0,0 +1,78 @@
+# core/amortization.py
+import math
+from typing import Tuple
+from .array_engine import CLEARED_THRESHOLD, monthly_rate
+
+def simulate_fixed_payment(balance: float, apr: float, payment: float, months: int) -> Tuple[float, int]:
+    """
+    Month-by-month reference for a single debt paid a fixed amount.
+    Gives up after a year when the payment does not cover the interest.
+    Returns (total_interest, months_simulated).
+    """
+    bal = float(balance)
+    r = monthly_rate(float(apr))
+    total_interest = 0.0
+    m = 0
+    while m < months and bal > CLEARED_THRESHOLD:
+        interest = bal * r
+        pay = min(payment, bal + interest)
+        bal = max(0.0, bal + interest - pay)
+        total_interest += interest
+        m += 1
+        if payment <= interest and m >= 12:
+            break
+    return total_interest, m
+
+def balance_after(balance: float, r: float, payment: float, k: int) -> float:
+    """Balance after k full payments (annuity recurrence, no payoff clipping)."""
+    if r == 0:
+        return balance - k * payment
+    growth = math.expm1(k * math.log1p(r))
+    return balance * (1.0 + growth) - payment * growth / r
+
+def months_to_payoff(balance: float, apr: float, payment: float) -> float:
+    """
+    Number of monthly payments until the balance drops to the cleared threshold.
+    Returns math.inf when the payment never gets ahead of the interest.
+    """
+    bal = float(balance)
+    if bal <= CLEARED_THRESHOLD:
+        return 0
+    r = monthly_rate(float(apr))
+    # a payment within rounding of the interest never moves the balance in float arithmetic
+    if payment - bal * r <= bal * 1e-9 or payment <= 0:
+        return math.inf
+    if r == 0:
+        n = math.ceil((bal - CLEARED_THRESHOLD) / payment)
+    else:
+        headroom = payment / r - bal
+        if headroom <= 0:
+            return math.inf
+        ratio = (payment / r - CLEARED_THRESHOLD) / headroom
+        n = max(1, math.ceil(math.log(ratio) / math.log1p(r)))
+    # the log/ceil pair can land one off at exact boundaries
+    while n > 1 and balance_after(bal, r, payment, n - 1) <= CLEARED_THRESHOLD:
+        n -= 1
+    while balance_after(bal, r, payment, n) > CLEARED_THRESHOLD:
+        n += 1
+    return n
+
+def interest_for_fixed_payment(balance: float, apr: float, payment: float, months: int) -> Tuple[float, int]:
+    """
+    Closed-form equivalent of simulate_fixed_payment: O(1) unless the payment
+    does not cover the first month's interest, where it falls back to simulation.
+    Returns (total_interest, months_simulated).
+    """
+    bal = float(balance)
+    if months <= 0 or bal <= CLEARED_THRESHOLD:
+        return 0.0, 0
+    r = monthly_rate(float(apr))
+    n = months_to_payoff(bal, apr, payment)
+    if n == math.inf:
+        return simulate_fixed_payment(bal, apr, payment, months)
+    m = int(min(n, months))
+    if r == 0:
+        return 0.0, m
+    # sum of r * B_j for j < m, with B_j from the annuity recurrence
+    growth = math.expm1(m * math.log1p(r))
+    return bal * growth - payment * (growth / r - m), m
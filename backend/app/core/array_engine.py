@@ -0,0 +1,255 @@
+# core/array_engine.py
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Tuple
+import numpy as np
+from .schemas import Debt, RepaymentPlan, RepaymentMonth, Allocation
+
+CLEARED_THRESHOLD = 0.01
+
+@dataclass
+class PlanArrays:
+    """
+    Array-backed repayment schedule. Row i is month i+1, column j is debts[j].
+    balances[i, j] is what debts[j] still owes after month i+1, recorded during the simulation.
+    """
+    strategy: str
+    names: List[str]
+    payment: np.ndarray
+    interest: np.ndarray
+    principal: np.ndarray
+    balances: np.ndarray
+
+    @property
+    def months_to_debt_free(self) -> int:
+        return int(self.payment.shape[0])
+
+    @property
+    def month_interest(self) -> np.ndarray:
+        return self.interest.sum(axis=1)
+
+    @property
+    def month_paid(self) -> np.ndarray:
+        return self.payment.sum(axis=1)
+
+    @property
+    def total_interest_paid(self) -> float:
+        return float(self.interest.sum())
+
+    @property
+    def total_paid(self) -> float:
+        return float(self.payment.sum())
+
+    @property
+    def balance_series(self) -> np.ndarray:
+        return self.balances.sum(axis=1)
+
+    def nested_months(self) -> List[Dict[str, Any]]:
+        """Months in the RepaymentMonth shape as plain dicts, without building Allocation models."""
+        month_interest = self.month_interest.tolist()
+        month_paid = self.month_paid.tolist()
+        return [
+            {
+                "month_index": mi + 1,
+                "allocations": [{"name": n, "payment": p, "interest_accrued": i, "principal_reduction": pr}
+                                for n, p, i, pr in zip(self.names, pays, ints, prins)],
+                "total_interest": month_interest[mi],
+                "total_paid": month_paid[mi],
+            }
+            for mi, (pays, ints, prins) in enumerate(zip(self.payment.tolist(), self.interest.tolist(), self.principal.tolist()))
+        ]
+
+    def flat_columns(self) -> Dict[str, np.ndarray]:
+        """
+        One row per (month, debt) as parallel 1-D columns. payment/interest/principal are
+        reshaped views of the schedule arrays, not copies.
+        """
+        months, n = self.payment.shape
+        return {
+            "month": np.repeat(np.arange(1, months + 1), n),
+            "debt": np.tile(np.array(self.names, dtype=object), months),
+            "payment": self.payment.reshape(-1),
+            "interest": self.interest.reshape(-1),
+            "principal": self.principal.reshape(-1),
+            "total_paid_month": np.repeat(self.month_paid, n),
+            "month_interest_total": np.repeat(self.month_interest, n),
+        }
+
+    @classmethod
+    def empty(cls, strategy: str, names: List[str]) -> "PlanArrays":
+        z = np.zeros((0, len(names)))
+        return cls(strategy=strategy, names=names, payment=z, interest=z.copy(), principal=z.copy(), balances=z.copy())
+
+def debts_to_arrays(debts: List[Debt]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    balances = np.array([float(d.balance) for d in debts], dtype=float)
+    aprs = np.array([float(d.apr) for d in debts], dtype=float)
+    mins = np.array([float(d.min_payment) for d in debts], dtype=float)
+    return balances, aprs, mins
+
+def monthly_rate(apr: float) -> float:
+    return max(0.0, apr) / 12.0
+
+def monthly_rates(aprs: np.ndarray) -> np.ndarray:
+    return np.maximum(0.0, aprs) / 12.0
+
+def priority_order(balances: np.ndarray, aprs: np.ndarray, strategy: str) -> np.ndarray:
+    # lexsort is stable and sorts by the last key first, matching sorted() on (primary, secondary).
+    # "optimal" fills by rate like avalanche (see optimization.compute_optimal_plan).
+    if strategy == "snowball":
+        return np.lexsort((-aprs, balances), axis=-1)
+    return np.lexsort((balances, -aprs), axis=-1)
+
+def allocate_month(balances: np.ndarray, aprs: np.ndarray, rates: np.ndarray, mins: np.ndarray,
+                   budget, strategy: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    One month of the minimums-then-extra rule. Works on the last axis, so balances may be
+    a (debts,) vector or a (rows, debts) matrix with one budget per row. Balances at or below
+    CLEARED_THRESHOLD count as paid off: they reserve no minimum and accrue no interest.
+    Returns (payment, interest) with the same shape as balances.
+    """
+    active = balances > CLEARED_THRESHOLD
+    interest = np.where(active, balances * rates, 0.0)
+    due = np.where(active, balances + interest, 0.0)
+    payment = np.minimum(due, mins)
+    min_total = np.where(active, mins, 0.0).sum(axis=-1)
+    remaining = np.maximum(0.0, np.asarray(budget, dtype=float) - min_total)
+
+    # extra goes down the priority list: each debt takes what is left after the ones ahead of it
+    order = priority_order(balances, aprs, strategy)
+    room = np.take_along_axis(np.maximum(0.0, due - payment), order, axis=-1)
+    ahead = np.cumsum(room, axis=-1) - room
+    extra_sorted = np.clip(remaining[..., None] - ahead, 0.0, room)
+    extra = np.empty_like(extra_sorted)
+    np.put_along_axis(extra, order, extra_sorted, axis=-1)
+    return payment + extra, interest
+
+def cap_to_budget(payment: np.ndarray, budget) -> np.ndarray:
+    """
+    Scale each row's payments down pro rata where they exceed that row's budget, i.e. where the
+    budget cannot even cover the minimums. Rounding-level excess is left alone so paid-off debts
+    do not keep a dust balance.
+    """
+    budget = np.asarray(budget, dtype=float)
+    paid = payment.sum(axis=-1)
+    short = paid > budget * (1.0 + 1e-9) + 1e-9
+    scale = np.where(short, budget / np.where(paid > 0, paid, 1.0), 1.0)
+    return payment * scale[..., None]
+
+def apply_month(balances: np.ndarray, rates: np.ndarray, payment: np.ndarray) -> np.ndarray:
+    # what is left at or below CLEARED_THRESHOLD is snapped to zero, so float dust on a
+    # paid-off debt cannot keep reserving its minimum in the following months
+    due = balances + balances * rates
+    after = np.maximum(0.0, due - np.minimum(payment, due))
+    return np.where((balances > CLEARED_THRESHOLD) & (after > CLEARED_THRESHOLD), after, 0.0)
+
+def simulate_from_state(balances: np.ndarray, aprs: np.ndarray, mins: np.ndarray, budget: float,
+                        months: int, strategy: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Monthly loop from an arbitrary balance vector. Returns (payment, interest, balances after each month)."""
+    rates = monthly_rates(aprs)
+    horizon = max(0, int(months))
+    payment = np.zeros((horizon, len(balances)))
+    interest = np.zeros((horizon, len(balances)))
+    trajectory = np.zeros((horizon, len(balances)))
+
+    mi = 0
+    while mi < horizon and not np.all(balances <= CLEARED_THRESHOLD):
+        payment[mi], interest[mi] = allocate_month(balances, aprs, rates, mins, budget, strategy)
+        balances = trajectory[mi] = apply_month(balances, rates, payment[mi])
+        mi += 1
+    return payment[:mi], interest[:mi], trajectory[:mi]
+
+def simulate_priority_plan(debts: List[Debt], budget: float, max_months: int, strategy: str) -> PlanArrays:
+    names = [d.name for d in debts]
+    balances, aprs, mins = debts_to_arrays(debts)
+    payment, interest, trajectory = simulate_from_state(balances, aprs, mins, budget, max_months, strategy)
+    principal = np.maximum(0.0, payment - interest)
+    return PlanArrays(strategy=strategy, names=names, payment=payment, interest=interest, principal=principal,
+                      balances=trajectory)
+
+def iter_priority_months(debts: List[Debt], budget: float, max_months: int,
+                         strategy: str) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Month-by-month form of simulate_priority_plan for streaming callers.
+    Yields (payment, interest, balances after the month) for each simulated month.
+    """
+    balances, aprs, mins = debts_to_arrays(debts)
+    rates = monthly_rates(aprs)
+    horizon = max(0, int(max_months))
+
+    mi = 0
+    while mi < horizon and not np.all(balances <= CLEARED_THRESHOLD):
+        payment, interest = allocate_month(balances, aprs, rates, mins, budget, strategy)
+        balances = apply_month(balances, rates, payment)
+        yield payment, interest, balances
+        mi += 1
+
+def to_repayment_plan(arrays: PlanArrays) -> RepaymentPlan:
+    months: List[RepaymentMonth] = []
+    month_interest = arrays.month_interest.tolist()
+    month_paid = arrays.month_paid.tolist()
+    for mi, (pays, ints, prins) in enumerate(zip(arrays.payment.tolist(), arrays.interest.tolist(), arrays.principal.tolist())):
+        allocs = [Allocation(name=n, payment=p, interest_accrued=i, principal_reduction=pr)
+                  for n, p, i, pr in zip(arrays.names, pays, ints, prins)]
+        months.append(RepaymentMonth(month_index=mi+1, allocations=allocs, total_interest=month_interest[mi], total_paid=month_paid[mi]))
+    return RepaymentPlan(strategy=arrays.strategy, months=months, total_interest_paid=arrays.total_interest_paid, months_to_debt_free=arrays.months_to_debt_free,
+                         balance_series=arrays.balance_series.tolist(), debt_balances=arrays.balances.tolist())
+
+@dataclass
+class BatchPlanSummary:
+    """
+    Per-row results of simulate_priority_batch. balance_series[u, :months_to_debt_free[u]] is the
+    total remaining balance after each simulated month for row u.
+    """
+    strategy: str
+    valid: np.ndarray
+    months_to_debt_free: np.ndarray
+    total_interest: np.ndarray
+    total_paid: np.ndarray
+    balance_series: np.ndarray
+
+def pad_debt_arrays(groups: List[List[Debt]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Stack debt lists of different lengths into (rows, max_debts) arrays, padding with paid-off debts."""
+    width = max((len(g) for g in groups), default=0)
+    balances = np.zeros((len(groups), width))
+    aprs = np.zeros((len(groups), width))
+    mins = np.zeros((len(groups), width))
+    for u, g in enumerate(groups):
+        if g:
+            balances[u, :len(g)], aprs[u, :len(g)], mins[u, :len(g)] = debts_to_arrays(g)
+    return balances, aprs, mins
+
+def simulate_priority_batch(balances: np.ndarray, aprs: np.ndarray, mins: np.ndarray, budgets: np.ndarray,
+                            max_months: int, strategy: str) -> BatchPlanSummary:
+    """
+    Run the same strategy for many independent debt portfolios at once, one per row.
+    Rows that fail budget/APR validation are reported with valid=False and an empty plan,
+    mirroring what compute_avalanche_plan / compute_snowball_plan return for them.
+    """
+    budgets = np.asarray(budgets, dtype=float)
+    rows = balances.shape[0]
+    horizon = max(0, int(max_months))
+    rates = monthly_rates(aprs)
+
+    min_total = np.where(balances > CLEARED_THRESHOLD, mins, 0.0).sum(axis=1)
+    valid = (budgets >= 0) & ~((min_total > 0) & (budgets < min_total)) & np.all(aprs >= 0, axis=1)
+
+    months = np.zeros(rows, dtype=int)
+    total_interest = np.zeros(rows)
+    total_paid = np.zeros(rows)
+    series = np.zeros((rows, horizon))
+    running = valid & ~np.all(balances <= CLEARED_THRESHOLD, axis=1)
+
+    mi = 0
+    while mi < horizon and running.any():
+        payment, interest = allocate_month(balances, aprs, rates, mins, budgets, strategy)
+        payment[~running] = 0.0
+        interest[~running] = 0.0
+        balances = np.where(running[:, None], apply_month(balances, rates, payment), balances)
+        total_interest += interest.sum(axis=1)
+        total_paid += payment.sum(axis=1)
+        series[running, mi] = balances[running].sum(axis=1)
+        months += running
+        running &= ~np.all(balances <= CLEARED_THRESHOLD, axis=1)
+        mi += 1
+
+    return BatchPlanSummary(strategy=strategy, valid=valid, months_to_debt_free=months, total_interest=total_interest,
+                            total_paid=total_paid, balance_series=series[:, :mi])
@@ -6,9 +6,9 @@ from .schemas import Debt, UserProfile
 from .optimization import (
     compute_avalanche_plan,
     compute_snowball_plan,
-    one_step_optimal_allocation,
+    compute_optimal_plan,
 )
-from .plan_utils import plan_to_dataframe, simulate_total_balance_series
+from .plan_utils import plan_to_dataframe
 from .education import rag_answer
 
 # ---------- Parsing & Presentation ----------
@@ -67,14 +67,14 @@ def run_plan_tool(
         plan = compute_snowball_plan(debts, budget, months)
         name = "Debt Snowball"
     elif strat.startswith("one") or strat.startswith("opt") or strat == "lp":
-        plan = one_step_optimal_allocation(debts, budget)
-        name = "One-Step Optimal (LP)"
+        plan = compute_optimal_plan(debts, budget, months)
+        name = "Mathematical Optimal"
     else:
         plan = compute_avalanche_plan(debts, budget, months)
         name = "Debt Avalanche"
 
     df = plan_to_dataframe(plan)
-    series = simulate_total_balance_series(debts, plan)
+    series = plan.balance_series
     summary = {
         "strategy_name": name,
         "months": len(plan.months),
@@ -1,18 +1,17 @@
 # core/education.py
 import os
-from typing import Tuple, List
-import streamlit as st
-from langchain_community.vectorstores import FAISS
-from langchain_ollama.embeddings import OllamaEmbeddings
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import TextLoader
+from functools import lru_cache
+from typing import Tuple, List, Optional
 from langchain_groq import ChatGroq
 from langchain_core.messages import SystemMessage, HumanMessage
+from app.config.settings import settings
+from .kb_embedding import BatchedOllamaEmbeddings, EmbeddingCache
+from .vector_index import KBIndex, IngestReport, build_serving_index, ingest_kb
 
-OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
-EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "nomic-embed-text")
 GROQ_LLM_MODEL = os.getenv("LLM_MODEL", "Gemma2-9b-It")
 GROQ_API_KEY = os.getenv("GROQ_API_KEY", None)
+KB_CHUNK_SIZE = 800
+KB_CHUNK_OVERLAP = 100
 
 SYNTHESIS_SYSTEM_PROMPT = """You are a helpful, concise finance tutor who must base answers on the provided context.
 - Answer directly and clearly.
@@ -21,45 +20,71 @@ SYNTHESIS_SYSTEM_PROMPT = """You are a helpful, concise finance tutor who must b
 - If the context doesn't contain enough info to answer confidently, say so and suggest what extra info is needed.
 """
 
-def _ollama_embedding():
+@lru_cache(maxsize=None)
+def _ollama_embedding() -> BatchedOllamaEmbeddings:
     try:
-        return OllamaEmbeddings(base_url=OLLAMA_BASE_URL, model=EMBEDDING_MODEL)
+        return BatchedOllamaEmbeddings(
+            base_url=settings.OLLAMA_BASE_URL,
+            model=settings.EMBEDDING_MODEL,
+            batch_size=settings.KB_EMBED_BATCH_SIZE,
+            concurrency=settings.KB_EMBED_CONCURRENCY,
+            cache=EmbeddingCache(settings.KB_EMBEDDING_CACHE)
+        )
     except Exception as e:
         raise RuntimeError(f"Ollama embeddings initialization failed: {e}")
 
-@st.cache_resource(show_spinner=False)
-def get_or_build_vectorstore(kb_dir: str = "kb") -> FAISS:
-    emb = _ollama_embedding()
-    splitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=100)
-    docs = []
-    for root, _, files in os.walk(kb_dir):
-        for fname in sorted(files):
-            if not fname.lower().endswith((".md", ".txt")):
-                continue
-            full = os.path.join(root, fname)
-            try:
-                loader = TextLoader(full, encoding="utf-8")
-                loaded = loader.load()
-                for d in loaded:
-                    if not d.metadata:
-                        d.metadata = {}
-                    d.metadata["source"] = fname
-                splits = splitter.split_documents(loaded)
-                docs.extend(splits)
-            except Exception:
-                pass
-    if not docs:
-        empty_vs = FAISS.from_texts([""], emb)
-        return empty_vs
-    vs = FAISS.from_documents(docs, emb)
+def ingest_knowledge_base(kb_dir: str = settings.KB_DIR, index_dir: str = settings.KB_INDEX_DIR,
+                          index_type: str = settings.KB_INDEX_TYPE, retrain: bool = False) -> IngestReport:
+    """
+    Re-embed new or changed KB files into the on-disk index and drop deleted ones, then
+    (re)train the serving index for `index_type` if it is missing or out of date.
+    """
+    kb, report = ingest_kb(kb_dir, index_dir, _ollama_embedding(), settings.EMBEDDING_MODEL, KB_CHUNK_SIZE, KB_CHUNK_OVERLAP)
+    serving = kb.manifest.get("serving")
+    if index_type == "flat":
+        stale = serving is not None
+    else:
+        stale = serving is None or serving["type"] != index_type or serving["generation"] != kb.manifest.get("generation", 0)
+    if retrain or stale:
+        try:
+            report.serving_index = build_serving_index(index_dir, index_type, settings.KB_IVF_NLIST or None, settings.KB_PQ_M or None, settings.RAG_IVF_NPROBE)
+        except ValueError as e:
+            print(f"KB serving index not built, searches use the flat index: {e}")
+    if report.changed or retrain or stale:
+        load_vectorstore.cache_clear()
+    return report
+
+@lru_cache(maxsize=None)
+def load_vectorstore(index_dir: str = settings.KB_INDEX_DIR) -> Optional[KBIndex]:
+    # memory-mapped serving index, so worker processes share the vectors through the page cache
+    vs = KBIndex.load(index_dir, _ollama_embedding(), mmap=True, serving=True, nprobe=settings.RAG_IVF_NPROBE)
+    if vs is None:
+        return None
+    built_with = (vs.manifest["embedding_model"], vs.manifest["chunk_size"], vs.manifest["chunk_overlap"])
+    if built_with != (settings.EMBEDDING_MODEL, KB_CHUNK_SIZE, KB_CHUNK_OVERLAP):
+        print(f"KB index at {index_dir} was built with {built_with}, ignoring it")
+        return None
+    return vs
+
+def get_or_build_vectorstore(kb_dir: str = settings.KB_DIR, index_dir: str = settings.KB_INDEX_DIR) -> KBIndex:
+    """
+    Load the persisted KB index; the corpus is only embedded when no usable index exists yet.
+    Run build_kb_index.py after editing kb/ to pick up changes incrementally.
+    """
+    vs = load_vectorstore(index_dir)
+    if vs is None:
+        report = ingest_knowledge_base(kb_dir, index_dir)
+        print(f"Built KB index: {len(report.added)} files, {report.chunks_embedded} chunks")
+        load_vectorstore.cache_clear()
+        vs = load_vectorstore(index_dir)
     return vs
 
 def _get_llm():
     return ChatGroq(model=GROQ_LLM_MODEL, groq_api_key=GROQ_API_KEY, temperature=0.2)
 
-def rag_answer(query: str, vs: FAISS, k: int = 4) -> Tuple[str, List[str]]:
+def rag_answer(query: str, vs: KBIndex, k: int = 4) -> Tuple[str, List[str]]:
     try:
-        docs = vs.similarity_search(query, k=k)
+        docs = vs.hybrid_search(query, k=k)
     except Exception as e:
         return f"(Retrieval error) {e}", []
     if not docs:
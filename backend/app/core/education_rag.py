@@ -2,7 +2,7 @@
 import os
 from typing import List, Tuple, Optional
 import streamlit as st
-from langchain_community.vectorstores import FAISS
+from .vector_index import KBIndex
 from langchain_groq import ChatGroq
 from langchain.chains import RetrievalQA
 from langchain.callbacks.base import BaseCallbackHandler
@@ -25,15 +25,15 @@ class StreamlitCallback(BaseCallbackHandler):
 def _get_llm():
     return ChatGroq(model=GROQ_LLM_MODEL, groq_api_key=GROQ_API_KEY, temperature=0.2)
 
-def build_retrieval_qa_chain(vs: FAISS, chain_type: str = "stuff", k: int = 4) -> RetrievalQA:
+def build_retrieval_qa_chain(vs: KBIndex, chain_type: str = "stuff", k: int = 4) -> RetrievalQA:
     llm = _get_llm()
     retriever = vs.as_retriever(search_kwargs={"k": k})
     qa = RetrievalQA.from_chain_type(llm=llm, chain_type=chain_type, retriever=retriever, return_source_documents=True)
     return qa
 
-def rag_answer_stream(query: str, vs: FAISS, placeholder: Optional[st.delta_generator] = None, k: int = 4) -> Tuple[str, List[str]]:
+def rag_answer_stream(query: str, vs: KBIndex, placeholder: Optional[st.delta_generator] = None, k: int = 4) -> Tuple[str, List[str]]:
     try:
-        docs = vs.similarity_search(query, k=k)
+        docs = vs.hybrid_search(query, k=k)
     except Exception as e:
         return f"(Retrieval error) {e}", []
     if not docs:
@@ -0,0 +1,192 @@
+# core/event_engine.py
+from dataclasses import dataclass
+from typing import List, Optional
+import numpy as np
+from .schemas import Debt, RepaymentPlan
+from .array_engine import (
+    CLEARED_THRESHOLD, PlanArrays, debts_to_arrays, monthly_rates,
+    priority_order, allocate_month, apply_month, to_repayment_plan
+)
+
+@dataclass
+class Segment:
+    """`length` consecutive months paying the same `payment` vector, starting from `balances`."""
+    start_month: int
+    length: int
+    balances: np.ndarray
+    payment: np.ndarray
+
+def _growth(rates: np.ndarray, k) -> np.ndarray:
+    # (1 + r)^k - 1, accurate for small rates
+    return np.expm1(np.multiply.outer(np.asarray(k, dtype=float), np.log1p(rates)))
+
+def balances_after(balances: np.ndarray, rates: np.ndarray, payment: np.ndarray, k) -> np.ndarray:
+    """Balances after k unclipped months at a fixed payment. k may be a scalar or a vector of months."""
+    k = np.asarray(k, dtype=float)
+    g = _growth(rates, k)
+    safe = np.where(rates > 0, rates, 1.0)
+    paid = np.where(rates > 0, payment * g / safe, payment * k[..., None])
+    return balances * (1.0 + g) - paid
+
+def interest_over(balances: np.ndarray, rates: np.ndarray, payment: np.ndarray, k: int) -> np.ndarray:
+    """Per-debt interest accrued over k unclipped months at a fixed payment."""
+    g = _growth(rates, k)
+    safe = np.where(rates > 0, rates, 1.0)
+    return np.where(rates > 0, balances * g - payment * (g / safe - k), 0.0)
+
+def first_month_below(balances: np.ndarray, rates: np.ndarray, payment: np.ndarray, threshold: np.ndarray) -> np.ndarray:
+    """
+    First month j >= 0 with balance_j <= threshold under a fixed payment, per debt.
+    np.inf where the payment never gets ahead of the interest.
+    """
+    threshold = np.broadcast_to(np.asarray(threshold, dtype=float), balances.shape)
+    out = np.full(balances.shape, np.inf)
+    out[balances <= threshold] = 0.0
+    todo = (balances > threshold) & (payment > balances * rates)
+    if not todo.any():
+        return out
+
+    b, r, p, t = balances[todo], rates[todo], payment[todo], threshold[todo]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        safe = np.where(r > 0, r, 1.0)
+        headroom = p / safe - b
+        geometric = np.ceil(np.log((p / safe - t) / headroom) / np.log1p(safe))
+        linear = np.ceil((b - t) / p)
+    j = np.where(r > 0, geometric, linear)
+    j = np.where(np.isfinite(j) & (r > 0) & (headroom <= 0), np.inf, j)
+    j = np.where(np.isfinite(j), np.maximum(j, 1.0), j)
+
+    # the log/ceil pair can land one off at exact boundaries
+    finite = np.isfinite(j)
+    for _ in range(2):
+        jj = np.where(finite, j, 1.0)
+        before = _balance_at(b, r, p, jj - 1)
+        at = _balance_at(b, r, p, jj)
+        j = np.where(finite & (jj > 1) & (before <= t), jj - 1, j)
+        j = np.where(finite & (at > t), jj + 1, j)
+    out[todo] = j
+    return out
+
+def _snap(balances: np.ndarray) -> np.ndarray:
+    # same paid-off rule as array_engine.apply_month
+    return np.where(balances > CLEARED_THRESHOLD, balances, 0.0)
+
+def _balance_at(b: np.ndarray, r: np.ndarray, p: np.ndarray, j: np.ndarray) -> np.ndarray:
+    g = np.expm1(j * np.log1p(r))
+    safe = np.where(r > 0, r, 1.0)
+    return np.where(r > 0, b * (1.0 + g) - p * g / safe, b - p * j)
+
+class LazyRepaymentPlan:
+    """
+    Summary of a plan computed by jumping between payoff events. Exposes the same summary
+    attributes as RepaymentPlan; the monthly schedule is only built when `months`,
+    `to_arrays()` or `model_dump()` is used.
+    """
+
+    def __init__(self, strategy: str, names: List[str], rates: np.ndarray, segments: List[Segment]):
+        self.strategy = strategy
+        self.names = names
+        self.rates = rates
+        self.segments = segments
+        self.months_to_debt_free = sum(s.length for s in segments)
+        self.total_interest_paid = float(sum(interest_over(s.balances, rates, s.payment, s.length).sum() for s in segments))
+        self.total_paid = float(sum(s.length * s.payment.sum() for s in segments))
+        self._arrays: Optional[PlanArrays] = None
+        self._plan: Optional[RepaymentPlan] = None
+
+    def to_arrays(self) -> PlanArrays:
+        if self._arrays is None:
+            n = len(self.names)
+            payment = np.zeros((self.months_to_debt_free, n))
+            interest = np.zeros((self.months_to_debt_free, n))
+            trajectory = np.zeros((self.months_to_debt_free, n))
+            for s in self.segments:
+                rows = slice(s.start_month, s.start_month + s.length)
+                payment[rows] = s.payment
+                interest[rows] = balances_after(s.balances, self.rates, s.payment, np.arange(s.length)) * self.rates
+                # same end-of-segment step as simulate_priority_events
+                if s.length == 1:
+                    trajectory[rows] = apply_month(s.balances, self.rates, s.payment)
+                else:
+                    trajectory[rows] = _snap(balances_after(s.balances, self.rates, s.payment, np.arange(1, s.length + 1)))
+            principal = np.maximum(0.0, payment - interest)
+            self._arrays = PlanArrays(strategy=self.strategy, names=self.names, payment=payment, interest=interest,
+                                      principal=principal, balances=trajectory)
+        return self._arrays
+
+    def to_repayment_plan(self) -> RepaymentPlan:
+        if self._plan is None:
+            self._plan = to_repayment_plan(self.to_arrays())
+        return self._plan
+
+    @property
+    def months(self):
+        return self.to_repayment_plan().months
+
+    @property
+    def balance_series(self) -> List[float]:
+        return self.to_repayment_plan().balance_series
+
+    def model_dump(self, *args, **kwargs):
+        return self.to_repayment_plan().model_dump(*args, **kwargs)
+
+def _steady_run_length(balances, aprs, rates, payment, budget, mins, strategy, limit: int) -> int:
+    """
+    How many months, starting now, the allocation stays exactly `payment`: no debt is capped or
+    drops to CLEARED_THRESHOLD (where it counts as paid off), and the extra keeps going to the
+    same debt.
+    """
+    active = balances > CLEARED_THRESHOLD
+    due = balances + balances * rates
+    if not active.any() or np.any(active & (payment >= due)):
+        return 1
+
+    clip = first_month_below(balances, rates, payment, payment / (1.0 + rates))
+    clear = first_month_below(balances, rates, payment, CLEARED_THRESHOLD)
+    length = min(float(clip[active].min()), float(clear[active].min()), float(limit))
+
+    min_total = np.where(active, mins, 0.0).sum()
+    if budget - min_total > 0 and length > 1:
+        order = priority_order(balances, aprs, strategy)
+        target = int(order[np.argmax(active[order])])
+        idx = np.arange(len(balances))
+        if strategy == "snowball":
+            competitors = active & (idx != target)
+            tie_first = (-aprs < -aprs[target]) | ((aprs == aprs[target]) & (idx < target))
+        else:
+            competitors = active & (idx != target) & (aprs == aprs[target])
+            tie_first = idx < target
+        if competitors.any():
+            months = np.arange(1, int(length))
+            path = balances_after(balances, rates, payment, months)
+            bt = path[:, target][:, None]
+            bc = path[:, competitors]
+            overtaken = np.any((bc < bt) | ((bc == bt) & tie_first[competitors]), axis=1)
+            if overtaken.any():
+                length = min(length, float(months[np.argmax(overtaken)]))
+    return max(1, int(length))
+
+def simulate_priority_events(debts: List[Debt], budget: float, max_months: int, strategy: str) -> LazyRepaymentPlan:
+    """
+    Same plan as array_engine.simulate_priority_plan, but between payoff events each balance
+    follows a closed-form geometric recurrence, so whole runs of identical months are skipped.
+    """
+    names = [d.name for d in debts]
+    balances, aprs, mins = debts_to_arrays(debts)
+    balances = _snap(balances)
+    rates = monthly_rates(aprs)
+    horizon = max(0, int(max_months))
+    segments: List[Segment] = []
+
+    mi = 0
+    while mi < horizon and not np.all(balances <= CLEARED_THRESHOLD):
+        payment, _ = allocate_month(balances, aprs, rates, mins, budget, strategy)
+        length = _steady_run_length(balances, aprs, rates, payment, budget, mins, strategy, horizon - mi)
+        segments.append(Segment(start_month=mi, length=length, balances=balances, payment=payment))
+        if length == 1:
+            balances = apply_month(balances, rates, payment)
+        else:
+            balances = _snap(balances_after(balances, rates, payment, length))
+        mi += length
+
+    return LazyRepaymentPlan(strategy, names, rates, segments)
@@ -0,0 +1,103 @@
+# core/hybrid_search.py
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i if in is it my of on or should the "
+    "to what when which who why will with you your".split()
+)
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens; short terms such as "emi" are kept, plurals folded"""
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+class BM25Index:
+    """
+    In-memory inverted index over chunk texts with Okapi BM25 scoring. Exact terms like
+    "CIBIL" or "balance transfer" score here even when the embedding puts them far apart.
+    """
+
+    def __init__(self, chunks: Dict[int, Dict[str, Any]], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.ids = np.asarray(sorted(chunks), dtype="int64")
+        lengths = np.zeros(len(self.ids), dtype="float32")
+        postings: Dict[str, Tuple[List[int], List[int]]] = defaultdict(lambda: ([], []))
+        for pos, chunk_id in enumerate(self.ids.tolist()):
+            counts = Counter(tokenize(chunks[chunk_id]["text"]))
+            lengths[pos] = sum(counts.values())
+            for term, tf in counts.items():
+                postings[term][0].append(pos)
+                postings[term][1].append(tf)
+        n = len(self.ids)
+        avg_length = float(lengths.mean()) if n and lengths.mean() > 0 else 1.0
+        self._norm = k1 * (1 - b + b * lengths / avg_length)
+        self._postings = {
+            term: (np.asarray(positions, dtype="int64"), np.asarray(tfs, dtype="float32"),
+                   math.log(1 + (n - len(positions) + 0.5) / (len(positions) + 0.5)))
+            for term, (positions, tfs) in postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        scores = np.zeros(len(self.ids), dtype="float32")
+        for term in set(tokenize(query)):
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            positions, tfs, idf = posting
+            scores[positions] += idf * tfs * (self.k1 + 1) / (tfs + self._norm[positions])
+        matched = np.flatnonzero(scores)
+        if matched.size == 0:
+            return []
+        top = matched[np.argsort(-scores[matched], kind="stable")[:k]]
+        return [(int(self.ids[pos]), float(scores[pos])) for pos in top]
+
+def reciprocal_rank_fusion(rankings: Iterable[Sequence[int]], k: int = 60) -> List[Tuple[int, float]]:
+    """Fuse ranked id lists: each id scores sum(1 / (k + rank)) over the lists it appears in"""
+    scores: Dict[int, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] += 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: -item[1])
+
+class CrossEncoderReranker:
+    """
+    Optional local reranker (a small sentence-transformers cross-encoder) that rescores the
+    fused candidates against the query. Needs the sentence-transformers package.
+    """
+
+    def __init__(self, model_name: str, max_chars: int = 2000):
+        from sentence_transformers import CrossEncoder
+        self.model_name = model_name
+        self.max_chars = max_chars
+        self._model = CrossEncoder(model_name)
+
+    def rerank(self, query: str, hits: List[Tuple[Dict[str, Any], float]]) -> List[Tuple[Dict[str, Any], float]]:
+        if len(hits) < 2:
+            return hits
+        scores = self._model.predict([(query, chunk["text"][:self.max_chars]) for chunk, _ in hits])
+        order = np.argsort(-np.asarray(scores, dtype="float32"), kind="stable")
+        return [(hits[i][0], float(scores[i])) for i in order]
+
+def load_reranker(model_name: Optional[str]) -> Optional[CrossEncoderReranker]:
+    if not model_name:
+        return None
+    try:
+        return CrossEncoderReranker(model_name)
+    except Exception as e:
+        print(f"Reranker {model_name} unavailable, using fused ranking only: {e}")
+        return None
@@ -0,0 +1,123 @@
+# core/kb_embedding.py
+import hashlib
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+import httpx
+from langchain_core.embeddings import Embeddings
+
+def chunk_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\n{text}".encode("utf-8")).hexdigest()
+
+class EmbeddingCache:
+    """
+    SQLite store of chunk embeddings keyed by sha256(model + chunk text). It lives outside the
+    index files, so a full index rebuild still reuses every vector it has seen before.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        self._conn.commit()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, np.ndarray]:
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            # stay well under SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype="float32")
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]) -> None:
+        if not items:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, np.asarray(vector, dtype="float32").tobytes()) for key, vector in items.items()]
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+class BatchedOllamaEmbeddings(Embeddings):
+    """
+    LangChain-compatible embeddings for KB ingestion. Chunks are looked up in the cache first;
+    the remaining unique texts go to Ollama's /api/embed in batches of `batch_size`, with at
+    most `concurrency` requests in flight over one pooled connection set.
+    """
+
+    def __init__(self, base_url: str, model: str, batch_size: int = 64, concurrency: int = 4,
+                 timeout_seconds: float = 120.0, cache: Optional[EmbeddingCache] = None,
+                 transport: Optional[httpx.BaseTransport] = None):
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.cache = cache
+        self.requests_sent = 0
+        self._client = httpx.Client(
+            base_url=base_url.rstrip("/"),
+            timeout=timeout_seconds,
+            limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency),
+            transport=transport
+        )
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        response = self._client.post("/api/embed", json={"model": self.model, "input": texts})
+        response.raise_for_status()
+        self.requests_sent += 1
+        vectors = np.asarray(response.json()["embeddings"], dtype="float32")
+        if len(vectors) != len(texts):
+            raise RuntimeError(f"Embedding server returned {len(vectors)} vectors for {len(texts)} texts")
+        return vectors
+
+    def embed_many(self, texts: List[str]) -> np.ndarray:
+        """Embeddings for `texts` as a (len(texts), dim) float32 array, in order"""
+        if not texts:
+            return np.zeros((0, 0), dtype="float32")
+        keys = [chunk_key(self.model, t) for t in texts]
+        known = self.cache.get_many(keys) if self.cache is not None else {}
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in known and key not in missing:
+                missing[key] = text
+        if missing:
+            pending = list(missing.items())
+            batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(batches))) as pool:
+                results = list(pool.map(lambda batch: self._embed_batch([t for _, t in batch]), batches))
+            fresh = {key: vector for batch, vectors in zip(batches, results) for (key, _), vector in zip(batch, vectors)}
+            if self.cache is not None:
+                self.cache.put_many(fresh)
+            known.update(fresh)
+        return np.stack([known[key] for key in keys])
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_many(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        # queries are one-off, so they skip the chunk cache
+        return self._embed_batch([text])[0].tolist()
+
+    def close(self) -> None:
+        self._client.close()
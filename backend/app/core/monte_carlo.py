@@ -0,0 +1,81 @@
+# core/monte_carlo.py
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import numpy as np
+from .schemas import Debt
+from .array_engine import CLEARED_THRESHOLD, debts_to_arrays, monthly_rates, allocate_month, apply_month, cap_to_budget
+
+@dataclass
+class ShockModel:
+    """
+    Random disturbances applied independently to each path.
+    apr_shock_std: std-dev of a per-path shift added to every APR (decimal, e.g. 0.02 = 2 points).
+    missed_payment_prob: chance that any given month's payment is skipped entirely.
+    income_drop_prob: chance that a path has one income drop somewhere in the horizon; during
+    the drop the budget shrinks by income_drop_fraction for income_drop_months months.
+    """
+    apr_shock_std: float = 0.0
+    missed_payment_prob: float = 0.0
+    income_drop_prob: float = 0.0
+    income_drop_fraction: float = 0.0
+    income_drop_months: int = 0
+
+@dataclass
+class PathResults:
+    months_to_debt_free: np.ndarray
+    total_interest: np.ndarray
+    debt_free: np.ndarray
+
+def simulate_paths(debts: List[Debt], budget: float, max_months: int, strategy: str, n_paths: int,
+                   shocks: ShockModel, seed: Optional[int] = None) -> PathResults:
+    """
+    Run n_paths shocked copies of the minimums-then-extra plan as one (paths, debts) batch.
+    When a month's budget falls short of the minimums, every minimum is scaled down pro rata.
+    """
+    rng = np.random.default_rng(seed)
+    base_balances, base_aprs, mins = debts_to_arrays(debts)
+    horizon = max(0, int(max_months))
+
+    balances = np.tile(base_balances, (n_paths, 1))
+    aprs = np.maximum(0.0, base_aprs + rng.normal(0.0, shocks.apr_shock_std, size=(n_paths, 1)))
+    rates = monthly_rates(aprs)
+    mins = np.tile(mins, (n_paths, 1))
+
+    # per-path, per-month budget: missed months pay nothing, drop windows pay the reduced budget
+    budgets = np.full((n_paths, horizon), float(budget))
+    has_drop = rng.random(n_paths) < shocks.income_drop_prob
+    drop_start = rng.integers(0, max(horizon, 1), size=n_paths)
+    month = np.arange(horizon)
+    in_drop = has_drop[:, None] & (month >= drop_start[:, None]) & (month < drop_start[:, None] + shocks.income_drop_months)
+    budgets[in_drop] *= 1.0 - shocks.income_drop_fraction
+    budgets[rng.random((n_paths, horizon)) < shocks.missed_payment_prob] = 0.0
+
+    months = np.zeros(n_paths, dtype=int)
+    total_interest = np.zeros(n_paths)
+    running = ~np.all(balances <= CLEARED_THRESHOLD, axis=1)
+
+    mi = 0
+    while mi < horizon and running.any():
+        payment, interest = allocate_month(balances, aprs, rates, mins, budgets[:, mi], strategy)
+        payment = cap_to_budget(payment, budgets[:, mi])
+        payment[~running] = 0.0
+        interest[~running] = 0.0
+        balances = np.where(running[:, None], apply_month(balances, rates, payment), balances)
+        total_interest += interest.sum(axis=1)
+        months += running
+        running &= ~np.all(balances <= CLEARED_THRESHOLD, axis=1)
+        mi += 1
+
+    return PathResults(months_to_debt_free=months, total_interest=total_interest, debt_free=~running)
+
+def percentile_bands(values: np.ndarray, percentiles=(10, 50, 90)) -> Dict[str, float]:
+    if values.size == 0:
+        return {f"p{p}": 0.0 for p in percentiles}
+    return {f"p{p}": float(v) for p, v in zip(percentiles, np.percentile(values, percentiles))}
+
+def merge_path_results(parts: List[PathResults]) -> PathResults:
+    return PathResults(
+        months_to_debt_free=np.concatenate([p.months_to_debt_free for p in parts]),
+        total_interest=np.concatenate([p.total_interest for p in parts]),
+        debt_free=np.concatenate([p.debt_free for p in parts]),
+    )
@@ -1,27 +1,48 @@
 # core/plan_utils.py
-from typing import List
-import pandas as pd
+from typing import Any, Dict, List, Union, TYPE_CHECKING
 from .schemas import Debt, RepaymentPlan
-from .optimization import _monthly_rate
+from .array_engine import PlanArrays, monthly_rate
 
-def plan_to_dataframe(plan: RepaymentPlan) -> pd.DataFrame:
-    rows = []
-    for m in plan.months:
-        for a in m.allocations:
-            rows.append({
-                "month": m.month_index,
-                "debt": a.name,
-                "payment": a.payment,
-                "interest": a.interest_accrued,
-                "principal": a.principal_reduction,
-                "total_paid_month": m.total_paid,
-                "month_interest_total": m.total_interest,
-            })
+if TYPE_CHECKING:
+    import pandas as pd
+
+SCHEDULE_COLUMNS = ["month", "debt", "payment", "interest", "principal", "total_paid_month", "month_interest_total"]
+
+def schedule_records(plan: Union[RepaymentPlan, PlanArrays]) -> List[Dict[str, Any]]:
+    """Flat schedule, one dict per (month, debt) with SCHEDULE_COLUMNS keys. Used for API responses."""
+    if isinstance(plan, PlanArrays):
+        columns = [c.tolist() for c in plan.flat_columns().values()]
+        return [dict(zip(SCHEDULE_COLUMNS, row)) for row in zip(*columns)]
+    return [
+        {
+            "month": m.month_index,
+            "debt": a.name,
+            "payment": a.payment,
+            "interest": a.interest_accrued,
+            "principal": a.principal_reduction,
+            "total_paid_month": m.total_paid,
+            "month_interest_total": m.total_interest,
+        }
+        for m in plan.months
+        for a in m.allocations
+    ]
+
+def plan_to_dataframe(plan: Union[RepaymentPlan, PlanArrays]) -> "pd.DataFrame":
+    # pandas is only for table/export views; keep it off the import path of the API
+    import pandas as pd
+    if isinstance(plan, PlanArrays):
+        return pd.DataFrame(plan.flat_columns(), columns=SCHEDULE_COLUMNS)
+    rows = schedule_records(plan)
     if not rows:
-        return pd.DataFrame(columns=["month","debt","payment","interest","principal","total_paid_month","month_interest_total"])
+        return pd.DataFrame(columns=SCHEDULE_COLUMNS)
     return pd.DataFrame(rows)
 
-def simulate_total_balance_series(initial_debts: List[Debt], plan: RepaymentPlan) -> List[float]:
+def simulate_total_balance_series(initial_debts: List[Debt], plan: Union[RepaymentPlan, PlanArrays]) -> List[float]:
+    # plans from the engines carry the trajectory recorded during simulation; replay only for hand-built plans
+    if isinstance(plan, PlanArrays):
+        return plan.balance_series.tolist()
+    if plan.balance_series or not plan.months:
+        return list(plan.balance_series)
     ds = [Debt(**d.model_dump()) for d in initial_debts]
     totals = []
     for m in plan.months:
@@ -30,7 +51,7 @@ def simulate_total_balance_series(initial_debts: List[Debt], plan: RepaymentPlan
             d = name_to.get(a.name)
             if not d or d.balance <= 0:
                 continue
-            r = _monthly_rate(d.apr)
+            r = monthly_rate(d.apr)
             interest = d.balance * r
             due = d.balance + interest
             pay = min(a.payment, due)
@@ -1,7 +1,8 @@
 # core/recommendations.py
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional
 from .schemas import Debt, UserProfile
 from .utils import money
+from .amortization import interest_for_fixed_payment
 import math
 
 HIGH_APR_THRESHOLD = 0.15
@@ -9,31 +10,11 @@ MEDIUM_APR_THRESHOLD = 0.08
 UTILIZATION_TARGET = 0.30
 EMERGENCY_FUND_MONTHS = 3
 
-def _monthly_rate(apr: float) -> float:
-    return max(0.0, apr) / 12.0
-
-def _simulate_interest_for_debt(debt: Debt, monthly_payment: float, months: int) -> Tuple[float,int]:
-    bal = float(debt.balance)
-    r = _monthly_rate(float(debt.apr))
-    total_interest = 0.0
-    m = 0
-    max_iter = months
-    while m < max_iter and bal > 0.01:
-        interest = bal * r
-        pay = min(monthly_payment, bal + interest)
-        principal = max(0.0, pay - interest)
-        bal = max(0.0, bal + interest - pay)
-        total_interest += interest
-        m += 1
-        if monthly_payment <= interest and m >= 12:
-            break
-    return total_interest, m
-
 def estimate_savings_by_extra(debt: Debt, extra_monthly: float, horizon_months: int = 12) -> float:
     base_payment = max(debt.min_payment, 0.0)
-    base_interest, _ = _simulate_interest_for_debt(debt, base_payment, horizon_months)
+    base_interest, _ = interest_for_fixed_payment(float(debt.balance), float(debt.apr), base_payment, horizon_months)
     new_payment = base_payment + extra_monthly
-    new_interest, _ = _simulate_interest_for_debt(debt, new_payment, horizon_months)
+    new_interest, _ = interest_for_fixed_payment(float(debt.balance), float(debt.apr), new_payment, horizon_months)
     return max(0.0, base_interest - new_interest)
 
 def _score_debt_for_priority(debt: Debt) -> float:
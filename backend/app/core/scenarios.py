@@ -1,7 +1,9 @@
 # core/scenarios.py
 from typing import List, Dict, Any
+import numpy as np
 from .schemas import Debt
-from .optimization import compute_avalanche_plan, compute_snowball_plan, one_step_optimal_allocation
+from .optimization import compute_avalanche_plan, compute_snowball_plan, compute_optimal_plan
+from .array_engine import BatchPlanSummary, debts_to_arrays, simulate_priority_batch
 
 def simulate_payoff(debts: List[Debt], base_budget: float, extra_payment: float=0.0,
                     consolidation_apr: float=0.0, months: int=36) -> Dict[str, Any]:
@@ -17,14 +19,22 @@ def simulate_payoff(debts: List[Debt], base_budget: float, extra_payment: float=
     budget = base_budget + extra_payment
     aval = compute_avalanche_plan(ds, budget, months)
     snow = compute_snowball_plan(ds, budget, months)
-    one = one_step_optimal_allocation(ds, budget)
+    opt = compute_optimal_plan(ds, budget, months)
     # pick best by total interest then months to debt free
-    candidates = [aval, snow, one]
+    candidates = [aval, snow, opt]
     best = min(candidates, key=lambda p: (p.total_interest_paid if p.total_interest_paid is not None else 1e12, p.months_to_debt_free if p.months_to_debt_free>0 else 1e9))
     return {
         "budget_used": budget,
         "avalanche": aval.model_dump(),
         "snowball": snow.model_dump(),
-        "one_step_optimal": one.model_dump(),
+        # key kept from the one-month LP this replaced; it now holds the full optimal plan
+        "one_step_optimal": opt.model_dump(),
         "best_plan": best.strategy
     }
+
+def sweep_budgets(debts: List[Debt], budgets: List[float], months: int, strategy: str="avalanche") -> BatchPlanSummary:
+    # one batched simulation over a budget grid; row i of the result belongs to budgets[i]
+    balances, aprs, mins = debts_to_arrays(debts)
+    rows = len(budgets)
+    return simulate_priority_batch(np.tile(balances, (rows, 1)), np.tile(aprs, (rows, 1)), np.tile(mins, (rows, 1)),
+                                   np.asarray(budgets, dtype=float), months, strategy)
@@ -85,3 +85,21 @@ class RepaymentPlan(BaseModel):
     months: List[RepaymentMonth]
     total_interest_paid: float
     months_to_debt_free: int
+    # trajectories recorded while simulating: remaining total / per-debt balance after each month
+    balance_series: List[float] = Field(default_factory=list, exclude=True)
+    debt_balances: List[List[float]] = Field(default_factory=list, exclude=True)
+
+class TimelineEvent(BaseModel):
+    """
+    A dated change inside a scenario; months are 1-based and inclusive.
+     - windfall: lump sum applied at the start of `month`, to `debts` in the given order,
+       or highest APR first when empty; whatever a debt cannot absorb moves to the next one
+     - rate_change: APR of `debts` (all when empty) moves by rate_change_percent points from `month` on
+     - budget_change: monthly budget moves by `amount` from `month` through `end_month` (open-ended if None)
+    """
+    kind: str
+    month: int = Field(ge=1)
+    end_month: Optional[int] = None
+    amount: float = 0.0
+    rate_change_percent: float = 0.0
+    debts: List[str] = Field(default_factory=list)
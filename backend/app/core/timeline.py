@@ -0,0 +1,104 @@
+# core/timeline.py
+from typing import List, Optional, Tuple
+import numpy as np
+from .schemas import Debt, TimelineEvent
+from .array_engine import (
+    CLEARED_THRESHOLD, PlanArrays, debts_to_arrays, monthly_rates,
+    allocate_month, apply_month, cap_to_budget
+)
+from .optimization import _validate_budget_and_aprs, compute_plan_arrays
+
+def _targets(event: TimelineEvent, names: List[str]) -> np.ndarray:
+    return np.array([n in event.debts for n in names]) if event.debts else np.ones(len(names), dtype=bool)
+
+def _apply_windfall(balances: np.ndarray, aprs: np.ndarray, names: List[str], event: TimelineEvent) -> np.ndarray:
+    if event.debts:
+        order = [names.index(n) for n in event.debts if n in names]
+    else:
+        order = np.lexsort((balances, -aprs)).tolist()
+    balances = balances.copy()
+    left = max(0.0, event.amount)
+    for j in order:
+        used = min(left, balances[j])
+        balances[j] -= used
+        left -= used
+    return balances
+
+def simulate_timeline(debts: List[Debt], budget: float, max_months: int, strategy: str,
+                      events: List[TimelineEvent], baseline: Optional[PlanArrays] = None) -> PlanArrays:
+    """
+    Minimums-then-extra plan with dated events applied as the months go by.
+    `baseline` is the same debts/budget/strategy without events; when given, every month before
+    the first event is copied from it and the simulation resumes from its balance snapshot.
+    Months whose budget cannot cover the minimums pay the minimums pro rata.
+    """
+    names = [d.name for d in debts]
+    balances, aprs, mins = debts_to_arrays(debts)
+    horizon = max(0, int(max_months))
+    events = sorted(events, key=lambda e: e.month)
+
+    payment = np.zeros((horizon, len(names)))
+    interest = np.zeros((horizon, len(names)))
+    trajectory = np.zeros((horizon, len(names)))
+
+    mi = 0
+    if baseline is not None and events:
+        shared = min(events[0].month - 1, baseline.months_to_debt_free, horizon)
+        payment[:shared] = baseline.payment[:shared]
+        interest[:shared] = baseline.interest[:shared]
+        trajectory[:shared] = baseline.balances[:shared]
+        if shared > 0:
+            balances = baseline.balances[shared - 1].copy()
+        mi = shared
+
+    # APR changes before the resume point still apply from here on
+    for e in events:
+        if e.kind == "rate_change" and e.month <= mi:
+            aprs = np.where(_targets(e, names), np.maximum(0.0, aprs + e.rate_change_percent / 100.0), aprs)
+
+    while mi < horizon:
+        month = mi + 1
+        for e in events:
+            if e.month != month:
+                continue
+            if e.kind == "windfall":
+                balances = _apply_windfall(balances, aprs, names, e)
+            elif e.kind == "rate_change":
+                aprs = np.where(_targets(e, names), np.maximum(0.0, aprs + e.rate_change_percent / 100.0), aprs)
+        if np.all(balances <= CLEARED_THRESHOLD):
+            break
+
+        month_budget = budget + sum(
+            e.amount for e in events
+            if e.kind == "budget_change" and e.month <= month and (e.end_month is None or month <= e.end_month)
+        )
+        month_budget = max(0.0, month_budget)
+        rates = monthly_rates(aprs)
+        pay, interest[mi] = allocate_month(balances, aprs, rates, mins, month_budget, strategy)
+        payment[mi] = cap_to_budget(pay, month_budget)
+        balances = trajectory[mi] = apply_month(balances, rates, payment[mi])
+        mi += 1
+
+    payment, interest = payment[:mi], interest[:mi]
+    principal = np.maximum(0.0, payment - interest)
+    return PlanArrays(strategy=strategy, names=names, payment=payment, interest=interest, principal=principal,
+                      balances=trajectory[:mi])
+
+def _same_debts(a: List[Debt], b: List[Debt]) -> bool:
+    key = lambda ds: [(d.name, float(d.balance), float(d.apr), float(d.min_payment)) for d in ds]
+    return key(a) == key(b)
+
+def compare_timeline(baseline_debts: List[Debt], scenario_debts: List[Debt], budget: float, max_months: int,
+                     strategy: str, events: List[TimelineEvent]) -> Tuple[PlanArrays, PlanArrays]:
+    """
+    Baseline plan plus the scenario timeline on top of it. The scenario resumes from the baseline
+    snapshot when both start from the same debts. Like compute_*_plan, a plan whose first month's
+    budget cannot cover the minimums comes back empty.
+    """
+    baseline = compute_plan_arrays(baseline_debts, budget, max_months, strategy)
+    first_budget = budget + sum(e.amount for e in events if e.kind == "budget_change" and e.month == 1)
+    ok, _ = _validate_budget_and_aprs(scenario_debts, first_budget)
+    if not ok:
+        return baseline, PlanArrays.empty(strategy, [d.name for d in scenario_debts])
+    shared = baseline if _same_debts(baseline_debts, scenario_debts) else None
+    return baseline, simulate_timeline(scenario_debts, budget, max_months, strategy, events, baseline=shared)
@@ -0,0 +1,402 @@
+# core/vector_index.py
+import hashlib
+import json
+import math
+import os
+import tempfile
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+import faiss
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from .hybrid_search import BM25Index, reciprocal_rank_fusion
+
+KB_EXTENSIONS = (".md", ".txt")
+INDEX_FILE = "index.faiss"
+CHUNKS_FILE = "chunks.jsonl"
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+
+# Serving index layouts built from the flat index by build_serving_index; {nlist}/{pq_m} are filled in.
+# Every layout, including the IDMap2-wrapped flat and sq8 ones, is memory-mapped by KBIndex.load.
+INDEX_TYPES = {
+    "flat": None,
+    "sq8": "IDMap2,SQ8",
+    "ivf": "IVF{nlist},Flat",
+    "ivf_sq8": "IVF{nlist},SQ8",
+    "ivf_pq": "IVF{nlist},PQ{pq_m}",
+}
+
+@dataclass
+class IngestReport:
+    added: List[str] = field(default_factory=list)
+    updated: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    chunks_embedded: int = 0
+    rebuilt: bool = False
+    serving_index: Optional[Dict[str, Any]] = None
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.updated or self.removed or self.rebuilt)
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    # cosine similarity as inner product on unit vectors
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def scan_kb(kb_dir: str) -> Dict[str, str]:
+    """Relative path -> content hash for every KB file"""
+    files = {}
+    for root, _, names in os.walk(kb_dir):
+        for fname in sorted(names):
+            if fname.lower().endswith(KB_EXTENSIONS):
+                full = os.path.join(root, fname)
+                files[os.path.relpath(full, kb_dir)] = file_sha256(full)
+    return files
+
+def _replace_file(index_dir: str, name: str, write) -> None:
+    """Write through a temp file in the same directory and rename it into place"""
+    fd, tmp = tempfile.mkstemp(dir=index_dir, prefix=f".{name}.")
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, os.path.join(index_dir, name))
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+def _write_manifest(index_dir: str, manifest: Dict[str, Any]) -> None:
+    def write(path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+    _replace_file(index_dir, MANIFEST_FILE, write)
+
+def split_file(kb_dir: str, rel_path: str, splitter: RecursiveCharacterTextSplitter) -> List[str]:
+    with open(os.path.join(kb_dir, rel_path), encoding="utf-8", errors="ignore") as f:
+        return splitter.split_text(f.read())
+
+class KBIndex:
+    """
+    Knowledge-base vectors in a FAISS IndexIDMap2 plus chunk texts and a manifest, stored in
+    one directory. Chunk ids are stable, so a changed file only replaces its own vectors.
+    similarity_search mirrors the LangChain FAISS call used by the RAG helpers.
+    """
+
+    def __init__(self, embeddings: Embeddings, index: Optional[faiss.Index], chunks: Dict[int, Dict[str, Any]],
+                 manifest: Dict[str, Any]):
+        self.embeddings = embeddings
+        self.index = index
+        self.chunks = chunks
+        self.manifest = manifest
+        self._bm25: Optional[BM25Index] = None
+
+    @classmethod
+    def empty(cls, embeddings: Embeddings, embedding_model: str, chunk_size: int, chunk_overlap: int) -> "KBIndex":
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "embedding_model": embedding_model,
+            "chunk_size": chunk_size,
+            "chunk_overlap": chunk_overlap,
+            "dimension": None,
+            "next_id": 0,
+            "generation": 0,
+            "files": {},
+        }
+        return cls(embeddings, None, {}, manifest)
+
+    @classmethod
+    def load(cls, index_dir: str, embeddings: Embeddings, mmap: bool = True, serving: bool = False,
+             nprobe: Optional[int] = None) -> Optional["KBIndex"]:
+        """
+        Open a saved index, or None if there is none. With mmap=True the vectors are mapped
+        read-only from disk (shared page cache between worker processes) instead of copied.
+
+        serving=True opens the trained IVF/quantized index from build_serving_index when it is
+        current, falling back to the flat index otherwise. That index is for search only.
+        """
+        manifest_path = os.path.join(index_dir, MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") != MANIFEST_VERSION:
+            return None
+
+        index = None
+        index_path = os.path.join(index_dir, INDEX_FILE)
+        entry = manifest.get("serving")
+        if serving and entry:
+            if entry.get("generation") == manifest.get("generation", 0) and os.path.exists(os.path.join(index_dir, entry["file"])):
+                index_path = os.path.join(index_dir, entry["file"])
+            else:
+                print(f"KB serving index {entry['type']} is out of date; using the flat index until it is rebuilt")
+        if os.path.exists(index_path):
+            # IO_FLAG_MMAP alone still copies the codes of IndexIDMap2-wrapped indexes into private
+            # memory; MMAP_IFC maps them from the file as well
+            flags = faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY if mmap else 0
+            index = faiss.read_index(index_path, flags)
+            ivf = faiss.try_extract_index_ivf(index)
+            if ivf is not None:
+                ivf.nprobe = nprobe or (entry or {}).get("nprobe", 16)
+
+        chunks: Dict[int, Dict[str, Any]] = {}
+        chunks_path = os.path.join(index_dir, CHUNKS_FILE)
+        if os.path.exists(chunks_path):
+            with open(chunks_path, encoding="utf-8") as f:
+                for line in f:
+                    chunk = json.loads(line)
+                    chunks[chunk["id"]] = chunk
+        return cls(embeddings, index, chunks, manifest)
+
+    def save(self, index_dir: str) -> None:
+        """Write index, chunks and manifest; each file is replaced atomically and the manifest last"""
+        os.makedirs(index_dir, exist_ok=True)
+
+        def write_chunks(path: str) -> None:
+            with open(path, "w", encoding="utf-8") as f:
+                for chunk_id in sorted(self.chunks):
+                    f.write(json.dumps(self.chunks[chunk_id]) + "\n")
+
+        if self.index is not None:
+            _replace_file(index_dir, INDEX_FILE, lambda path: faiss.write_index(self.index, path))
+        _replace_file(index_dir, CHUNKS_FILE, write_chunks)
+        _write_manifest(index_dir, self.manifest)
+
+    @property
+    def size(self) -> int:
+        return 0 if self.index is None else int(self.index.ntotal)
+
+    @property
+    def bm25(self) -> BM25Index:
+        """Keyword index over the chunk texts, built on first use"""
+        if self._bm25 is None:
+            self._bm25 = BM25Index(self.chunks)
+        return self._bm25
+
+    def _ensure_index(self, dimension: int) -> None:
+        if self.index is None:
+            self.index = faiss.IndexIDMap2(faiss.IndexFlatIP(dimension))
+            self.manifest["dimension"] = dimension
+
+    def add_file(self, rel_path: str, sha256: str, texts: List[str], vectors: np.ndarray) -> None:
+        source = os.path.basename(rel_path)
+        ids = np.arange(self.manifest["next_id"], self.manifest["next_id"] + len(texts), dtype="int64")
+        if len(texts):
+            self._ensure_index(vectors.shape[1])
+            self.index.add_with_ids(_normalize(vectors), ids)
+        for chunk_id, text in zip(ids.tolist(), texts):
+            self.chunks[chunk_id] = {"id": chunk_id, "path": rel_path, "source": source, "text": text}
+        self.manifest["next_id"] += len(texts)
+        self.manifest["files"][rel_path] = {"sha256": sha256, "chunk_ids": ids.tolist()}
+        self._bm25 = None
+
+    def remove_file(self, rel_path: str) -> None:
+        entry = self.manifest["files"].pop(rel_path, None)
+        if not entry:
+            return
+        ids = np.asarray(entry["chunk_ids"], dtype="int64")
+        if self.index is not None and ids.size:
+            self.index.remove_ids(ids)
+        for chunk_id in entry["chunk_ids"]:
+            self.chunks.pop(chunk_id, None)
+        self._bm25 = None
+
+    def search_by_vector(self, vector: np.ndarray, k: int) -> List[Tuple[Dict[str, Any], float]]:
+        if self.size == 0:
+            return []
+        scores, ids = self.index.search(_normalize(np.asarray(vector).reshape(1, -1)), min(k, self.size))
+        return [(self.chunks[i], float(s)) for i, s in zip(ids[0].tolist(), scores[0].tolist()) if i in self.chunks]
+
+    def hybrid_search_by_vector(self, query: str, vector: np.ndarray, k: int, candidates: int = 20,
+                                reranker=None) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Top `candidates` from FAISS and from BM25, fused with reciprocal-rank fusion and
+        optionally rescored by `reranker`; scores are the fused (or reranker) scores.
+        """
+        candidates = max(candidates, k)
+        dense = [chunk["id"] for chunk, _ in self.search_by_vector(vector, candidates)]
+        sparse = [chunk_id for chunk_id, _ in self.bm25.search(query, candidates)]
+        hits = [(self.chunks[i], score) for i, score in reciprocal_rank_fusion([dense, sparse])[:candidates] if i in self.chunks]
+        if reranker is not None:
+            hits = reranker.rerank(query, hits)
+        return hits[:k]
+
+    @staticmethod
+    def _to_document(chunk: Dict[str, Any]) -> Document:
+        return Document(page_content=chunk["text"], metadata={"source": chunk["source"], "path": chunk["path"], "id": chunk["id"]})
+
+    def hybrid_search(self, query: str, k: int = 4, candidates: int = 20, reranker=None) -> List[Document]:
+        vector = np.asarray(self.embeddings.embed_query(query), dtype="float32")
+        return [self._to_document(chunk) for chunk, _ in self.hybrid_search_by_vector(query, vector, k, candidates, reranker)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4) -> List[Tuple[Document, float]]:
+        vector = np.asarray(self.embeddings.embed_query(query), dtype="float32")
+        return [
+            (self._to_document(chunk), score)
+            for chunk, score in self.search_by_vector(vector, k)
+        ]
+
+    def similarity_search(self, query: str, k: int = 4) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    def as_retriever(self, search_kwargs: Optional[Dict[str, Any]] = None) -> "KBRetriever":
+        return KBRetriever(kb_index=self, k=(search_kwargs or {}).get("k", 4))
+
+class KBRetriever(BaseRetriever):
+    """LangChain retriever over a KBIndex, for chains such as RetrievalQA"""
+    kb_index: Any
+    k: int = 4
+
+    def _get_relevant_documents(self, query: str, *, run_manager=None) -> List[Document]:
+        return self.kb_index.hybrid_search(query, k=self.k)
+
+def iter_changed_files(kb_dir: str, files: Dict[str, str], known: Dict[str, Dict[str, Any]],
+                       splitter: RecursiveCharacterTextSplitter, report: IngestReport) -> Iterator[Tuple[str, str, List[str]]]:
+    """Read and split new or changed files one at a time, yielding (rel_path, sha256, chunks)"""
+    for rel_path, sha256 in files.items():
+        previous = known.get(rel_path)
+        if previous and previous["sha256"] == sha256:
+            report.unchanged += 1
+            continue
+        try:
+            texts = split_file(kb_dir, rel_path, splitter)
+        except Exception as e:
+            print(f"KB ingest: skipping {rel_path}: {e}")
+            continue
+        yield rel_path, sha256, texts
+
+def _embed(embeddings: Embeddings, texts: List[str]) -> np.ndarray:
+    if hasattr(embeddings, "embed_many"):
+        return embeddings.embed_many(texts)
+    return np.asarray(embeddings.embed_documents(texts), dtype="float32")
+
+def ingest_kb(kb_dir: str, index_dir: str, embeddings: Embeddings, embedding_model: str,
+              chunk_size: int = 800, chunk_overlap: int = 100, embed_window: int = 256) -> Tuple[KBIndex, IngestReport]:
+    """
+    Bring the on-disk index in line with kb_dir: embed only new or changed files (by content
+    hash) and drop the vectors of deleted ones. A different embedding model or chunking
+    invalidates every vector, so the index is then rebuilt from scratch.
+
+    Files are split as they are read and their chunks embedded in windows of about
+    `embed_window` chunks spanning several files, so the embedder can batch across small files
+    without the whole corpus being held in memory.
+    """
+    report = IngestReport()
+    kb = KBIndex.load(index_dir, embeddings, mmap=False)
+    if kb is not None and (kb.manifest["embedding_model"], kb.manifest["chunk_size"], kb.manifest["chunk_overlap"]) != (embedding_model, chunk_size, chunk_overlap):
+        kb = None
+    if kb is None:
+        kb = KBIndex.empty(embeddings, embedding_model, chunk_size, chunk_overlap)
+        report.rebuilt = os.path.exists(os.path.join(index_dir, MANIFEST_FILE))
+
+    current = scan_kb(kb_dir) if os.path.isdir(kb_dir) else {}
+    for rel_path in sorted(set(kb.manifest["files"]) - set(current)):
+        kb.remove_file(rel_path)
+        report.removed.append(rel_path)
+
+    def flush(window: List[Tuple[str, str, List[str]]]) -> None:
+        texts = [t for _, _, chunks in window for t in chunks]
+        vectors = _embed(embeddings, texts) if texts else np.zeros((0, 0), dtype="float32")
+        offset = 0
+        for rel_path, sha256, chunks in window:
+            updated = rel_path in kb.manifest["files"]
+            kb.remove_file(rel_path)
+            kb.add_file(rel_path, sha256, chunks, vectors[offset:offset + len(chunks)])
+            offset += len(chunks)
+            (report.updated if updated else report.added).append(rel_path)
+        report.chunks_embedded += len(texts)
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    window: List[Tuple[str, str, List[str]]] = []
+    pending = 0
+    for item in iter_changed_files(kb_dir, current, kb.manifest["files"], splitter, report):
+        window.append(item)
+        pending += len(item[2])
+        if pending >= embed_window:
+            flush(window)
+            window, pending = [], 0
+    if window:
+        flush(window)
+
+    if report.changed:
+        # any serving index built from the previous contents is now stale
+        kb.manifest["generation"] = kb.manifest.get("generation", 0) + 1
+    if report.changed or not os.path.exists(os.path.join(index_dir, MANIFEST_FILE)):
+        kb.save(index_dir)
+    return kb, report
+
+def _default_nlist(n: int) -> int:
+    # ~4*sqrt(n) lists, with enough points per list (>= 39) to train the centroids
+    return max(1, min(int(4 * math.sqrt(n)), n // 39))
+
+def build_serving_index(index_dir: str, index_type: str, nlist: Optional[int] = None, pq_m: Optional[int] = None,
+                        nprobe: int = 16, max_train_points: int = 100_000) -> Optional[Dict[str, Any]]:
+    """
+    Train an IVF and/or quantized copy of the flat index for serving and record it in the
+    manifest. The flat index stays the source of truth for incremental ingestion; rerun this
+    after ingesting changes. index_type "flat" removes any serving index.
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type {index_type!r}; expected one of {', '.join(INDEX_TYPES)}")
+    kb = KBIndex.load(index_dir, embeddings=None, mmap=True)
+    if kb is None:
+        raise ValueError(f"No KB index at {index_dir}; ingest the knowledge base first")
+
+    previous = kb.manifest.pop("serving", None)
+    if INDEX_TYPES[index_type] is None:
+        _write_manifest(index_dir, kb.manifest)
+        if previous and os.path.exists(os.path.join(index_dir, previous["file"])):
+            os.remove(os.path.join(index_dir, previous["file"]))
+        return None
+
+    n, dimension = kb.size, kb.manifest["dimension"]
+    if n == 0:
+        raise ValueError("The KB index is empty; nothing to train on")
+    nlist = nlist or _default_nlist(n)
+    pq_m = pq_m or next(m for m in range(max(1, dimension // 8), 0, -1) if dimension % m == 0)
+    if "IVF" in INDEX_TYPES[index_type] and n < nlist:
+        raise ValueError(f"{index_type} with {nlist} lists needs at least {nlist} vectors, the index has {n}")
+    if index_type == "ivf_pq":
+        if dimension % pq_m:
+            raise ValueError(f"pq_m={pq_m} must divide the embedding dimension {dimension}")
+        if n < 256:
+            raise ValueError(f"ivf_pq needs at least 256 vectors to train its codebooks, the index has {n}")
+
+    vectors = kb.index.index.reconstruct_n(0, n)
+    ids = faiss.vector_to_array(kb.index.id_map).astype("int64")
+    train = vectors
+    if n > max_train_points:
+        train = vectors[np.random.default_rng(0).choice(n, max_train_points, replace=False)]
+
+    index = faiss.index_factory(dimension, INDEX_TYPES[index_type].format(nlist=nlist, pq_m=pq_m), faiss.METRIC_INNER_PRODUCT)
+    index.train(np.ascontiguousarray(train))
+    index.add_with_ids(vectors, ids)
+
+    entry = {
+        "type": index_type,
+        "file": f"index.{index_type}.faiss",
+        "generation": kb.manifest.get("generation", 0),
+        "nlist": nlist if "IVF" in INDEX_TYPES[index_type] else None,
+        "pq_m": pq_m if index_type == "ivf_pq" else None,
+        "nprobe": nprobe,
+        "vectors": n,
+    }
+    _replace_file(index_dir, entry["file"], lambda path: faiss.write_index(index, path))
+    kb.manifest["serving"] = entry
+    _write_manifest(index_dir, kb.manifest)
+    if previous and previous["file"] != entry["file"] and os.path.exists(os.path.join(index_dir, previous["file"])):
+        os.remove(os.path.join(index_dir, previous["file"]))
+    return entry
@@ -2,6 +2,10 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config.settings import settings
 from app.config.database import init_database, close_database
+from app.services.strategy_executor import strategy_executor
+from app.services.llm_client import llm_client
+from app.services.embedding_client import embedding_client
+from app.services.rag_service import kb_index_handle
 from app.api.routes.auth import router as auth_router
 from app.api.routes.debts import router as debt_router
 # from app.api.routes.credit import router as credit_router  # Commented out temporarily
@@ -45,7 +49,13 @@ async def health_check():
 @app.on_event("startup")
 async def startup_event():
     await init_database()
+    strategy_executor.start()
+    llm_client.start()
+    await kb_index_handle.load()
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    strategy_executor.shutdown()
+    await llm_client.close()
+    await embedding_client.close()
     await close_database()
\ No newline at end of file
@@ -0,0 +1,18 @@
+# app/models/chat.py
+from beanie import Document
+from pydantic import Field
+from pymongo import IndexModel
+from datetime import datetime
+
+class ChatMessage(Document):
+    clerk_user_id: str
+    role: str  # "user" or "assistant"
+    content: str
+    used_financial_data: bool = False
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "chat_messages"
+        indexes = [
+            IndexModel([("clerk_user_id", 1), ("created_at", -1)])
+        ]
@@ -0,0 +1,21 @@
+# app/models/plan_cache.py
+from beanie import Document
+from pydantic import Field
+from pymongo import IndexModel
+from typing import Dict, Any
+from datetime import datetime
+
+class PlanCacheEntry(Document):
+    key: str
+    clerk_user_id: str
+    payload: Dict[str, Any]
+    expires_at: datetime
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "plan_cache"
+        indexes = [
+            IndexModel([("key", 1)], unique=True),
+            "clerk_user_id",
+            IndexModel([("expires_at", 1)], expireAfterSeconds=0)
+        ]
@@ -25,16 +25,19 @@ class RepaymentMonthResponse(BaseModel):
     total_interest: float
     total_paid: float
 
+# Detail representations a client can opt out of with ?fields=...; summaries are always returned
+PLAN_DETAIL_FIELDS = ("months", "schedule_df", "balance_series")
+
 class RepaymentPlanResponse(BaseModel):
     strategy_name: str
-    months: List[RepaymentMonthResponse]
+    months: Optional[List[RepaymentMonthResponse]] = None
     total_interest_paid: float
     months_to_debt_free: int
-    schedule_df: List[Dict[str, Any]]
-    balance_series: List[float]
+    schedule_df: Optional[List[Dict[str, Any]]] = None
+    balance_series: Optional[List[float]] = None
 
 class StrategyComparisonResponse(BaseModel):
     avalanche: RepaymentPlanResponse
     snowball: RepaymentPlanResponse
-    optimal: RepaymentPlanResponse
+    optimal: RepaymentPlanResponse  # same schedule as avalanche, under the optimal label
     best_strategy: str
\ No newline at end of file
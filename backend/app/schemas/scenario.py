@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional, List, Dict, Any
 from enum import Enum
 
@@ -8,6 +8,28 @@ class ScenarioType(str, Enum):
     INTEREST_RATE_CHANGE = "interest_rate_change"
     DEBT_CONSOLIDATION = "debt_consolidation"
     WINDFALL = "windfall"
+    TIMELINE = "timeline"
+
+class EventType(str, Enum):
+    WINDFALL = "windfall"
+    RATE_CHANGE = "rate_change"
+    BUDGET_CHANGE = "budget_change"
+
+class ScenarioEvent(BaseModel):
+    type: EventType
+    month: int = Field(..., ge=1)
+    end_month: Optional[int] = Field(default=None, ge=1)  # budget_change only, inclusive
+    amount: float = Field(default=0.0)  # windfall amount, or budget change (negative for a cut)
+    rate_change_percent: float = Field(default=0.0)
+    debts: List[str] = Field(default=[])  # targets; empty = all debts (windfall: highest APR first)
+
+    @model_validator(mode="after")
+    def check_event(self):
+        if self.end_month is not None and self.end_month < self.month:
+            raise ValueError("end_month must be >= month")
+        if self.type == EventType.WINDFALL and self.amount < 0:
+            raise ValueError("Windfall amount must be non-negative")
+        return self
 
 class WhatIfRequest(BaseModel):
     scenario_type: ScenarioType
@@ -24,6 +46,9 @@ class WhatIfRequest(BaseModel):
     consolidation_fee: Optional[float] = Field(default=0.0, ge=0)
     windfall_amount: Optional[float] = Field(default=0.0, ge=0)
     windfall_month: Optional[int] = Field(default=1, ge=1)
+    
+    # Dated events applied on top of the scenario type (the only changes for "timeline")
+    events: List[ScenarioEvent] = Field(default=[], max_length=50)
 
 class ScenarioComparison(BaseModel):
     baseline: Dict[str, Any]
@@ -31,4 +56,80 @@ class ScenarioComparison(BaseModel):
     interest_savings: float
     months_saved: int
     payment_difference: float
-    insights: List[str]
\ No newline at end of file
+    insights: List[str]
+
+MAX_SWEEP_POINTS = 240
+
+class SweepRequest(BaseModel):
+    base_budget: float = Field(..., gt=0)
+    base_strategy: str = Field(default="avalanche")
+    analysis_months: int = Field(default=60, ge=12, le=120)
+    
+    # Either a budget range...
+    budget_min: Optional[float] = Field(default=None, gt=0)
+    budget_max: Optional[float] = Field(default=None, gt=0)
+    budget_step: Optional[float] = Field(default=None, gt=0)
+    # ...or extra payments on top of base_budget
+    extra_payments: Optional[List[float]] = None
+
+    @model_validator(mode="after")
+    def check_grid(self):
+        has_range = self.budget_min is not None or self.budget_max is not None
+        if has_range == bool(self.extra_payments):
+            raise ValueError("Provide either budget_min/budget_max/budget_step or extra_payments")
+        if has_range:
+            if self.budget_min is None or self.budget_max is None or self.budget_step is None:
+                raise ValueError("budget_min, budget_max and budget_step are all required for a budget range")
+            if self.budget_max < self.budget_min:
+                raise ValueError("budget_max must be >= budget_min")
+            points = int((self.budget_max - self.budget_min) // self.budget_step) + 1
+        else:
+            if any(extra < 0 for extra in self.extra_payments):
+                raise ValueError("extra_payments must be non-negative")
+            points = len(self.extra_payments)
+        if points > MAX_SWEEP_POINTS:
+            raise ValueError(f"Sweep grid has {points} points, the maximum is {MAX_SWEEP_POINTS}")
+        return self
+
+class SweepPoint(BaseModel):
+    monthly_budget: float
+    extra_payment: float
+    feasible: bool
+    debt_free: bool
+    months_to_debt_free: int
+    total_interest: float
+    total_payments: float
+    months_saved: int
+    interest_savings: float
+
+class SweepResponse(BaseModel):
+    strategy: str
+    baseline: SweepPoint
+    points: List[SweepPoint]
+
+class MonteCarloRequest(BaseModel):
+    base_budget: float = Field(..., gt=0)
+    base_strategy: str = Field(default="avalanche")
+    analysis_months: int = Field(default=60, ge=12, le=120)
+    n_paths: int = Field(default=5000, ge=100, le=20000)
+    
+    # Shock model
+    apr_shock_std_percent: float = Field(default=2.0, ge=0, le=50)
+    missed_payment_prob: float = Field(default=0.02, ge=0, le=1)
+    income_drop_prob: float = Field(default=0.1, ge=0, le=1)
+    income_drop_percent: float = Field(default=30.0, ge=0, le=100)
+    income_drop_months: int = Field(default=6, ge=0, le=120)
+    seed: Optional[int] = Field(default=None, ge=0)
+
+class PercentileBand(BaseModel):
+    p10: float
+    p50: float
+    p90: float
+
+class MonteCarloResponse(BaseModel):
+    strategy: str
+    n_paths: int
+    baseline: Dict[str, Any]
+    months_to_debt_free: PercentileBand
+    total_interest: PercentileBand
+    probability_debt_free: float
@@ -1,5 +1,5 @@
 # app/services/credit_service.py - UPDATED VERSION WITH CREDIT CARD SUPPORT
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator
 from datetime import datetime
 from beanie import PydanticObjectId
 
@@ -13,6 +13,8 @@ from app.schemas.credit import (
     DebtImpactOnCredit, CreditAnalysisResponse, CreditScoreTipRequest
 )
 from app.services.llm_service import LLMService
+from app.utils.sse import sse_event
+from app.utils.single_flight import single_flight
 
 class CreditService:
     
@@ -492,8 +494,8 @@ class CreditService:
     
     # Rest of the methods remain the same as they work with the enhanced profile data
     @staticmethod
-    async def generate_ai_action_plan(clerk_user_id: str, request: CreditScoreTipRequest) -> str:
-        """Generate AI-powered credit improvement plan with accurate credit card data"""
+    async def _build_ai_action_plan_prompt(clerk_user_id: str) -> str:
+        """Prompt for the AI credit improvement plan, built from the user's current credit card data"""
         profile = await CreditService.get_or_create_profile(clerk_user_id)
         profile.recalculate_utilization()  # Ensure current data
         
@@ -572,16 +574,57 @@ class CreditService:
         Focus on actionable steps with actual rupee amounts and percentages.
         """
         
-        ai_response = await LLMService.generate_credit_advice(prompt)
+        return prompt
+    
+    @staticmethod
+    async def generate_ai_action_plan(clerk_user_id: str, request: CreditScoreTipRequest) -> str:
+        """Generate AI-powered credit improvement plan with accurate credit card data"""
+        prompt = await CreditService._build_ai_action_plan_prompt(clerk_user_id)
+        ai_response = await LLMService.generate_credit_advice(prompt, user_id=clerk_user_id)
         return ai_response
     
+    @staticmethod
+    async def stream_comprehensive_analysis(clerk_user_id: str, request: CreditScoreTipRequest) -> AsyncIterator[str]:
+        """
+        Server-sent events for /generate-tips: the AI plan as "token" events while the LLM writes
+        it, then a "done" event carrying the full CreditAnalysisResponse (which saves the plan).
+        """
+        try:
+            prompt = await CreditService._build_ai_action_plan_prompt(clerk_user_id)
+            parts = []
+            async for delta in LLMService.stream_credit_advice(prompt, user_id=clerk_user_id):
+                parts.append(delta)
+                yield sse_event("token", {"delta": delta})
+            
+            analysis = await CreditService.get_comprehensive_analysis(clerk_user_id, request, ai_plan="".join(parts))
+            yield sse_event("done", analysis.model_dump(mode="json"))
+        except Exception as e:
+            # Headers are already sent, so the failure has to travel as an event
+            print(f"Error streaming credit tips: {e}")
+            yield sse_event("error", {"detail": str(e)})
+    
     @staticmethod
     async def get_comprehensive_analysis(
         clerk_user_id: str, 
-        request: CreditScoreTipRequest
+        request: CreditScoreTipRequest,
+        ai_plan: Optional[str] = None
     ) -> CreditAnalysisResponse:
         """Enhanced comprehensive analysis with actual credit card data"""
+        if ai_plan is not None:
+            return await CreditService._build_comprehensive_analysis(clerk_user_id, request, ai_plan)
         
+        # Repeated clicks while an analysis is running wait for that one instead of starting another
+        return await single_flight.do(
+            ("credit-analysis", clerk_user_id, request.model_dump_json()),
+            lambda: CreditService._build_comprehensive_analysis(clerk_user_id, request, None)
+        )
+    
+    @staticmethod
+    async def _build_comprehensive_analysis(
+        clerk_user_id: str, 
+        request: CreditScoreTipRequest,
+        ai_plan: Optional[str]
+    ) -> CreditAnalysisResponse:
         profile = await CreditService.get_or_create_profile(clerk_user_id)
         profile.recalculate_utilization()  # Ensure fresh calculations
         
@@ -606,7 +649,9 @@ class CreditService:
         utilization_breakdown = await CreditService.generate_utilization_breakdown(clerk_user_id)
         quick_wins = await CreditService.generate_quick_wins(profile, debts)
         
-        ai_plan = await CreditService.generate_ai_action_plan(clerk_user_id, request)
+        # The streaming endpoint has already generated the plan
+        if ai_plan is None:
+            ai_plan = await CreditService.generate_ai_action_plan(clerk_user_id, request)
         
         # Update profile with AI analysis
         profile.last_ai_analysis = {"generated_plan": ai_plan}
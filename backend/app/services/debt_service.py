@@ -3,6 +3,7 @@ from beanie import PydanticObjectId
 from app.models.debt import Debt
 from app.models.user import User
 from app.schemas.debt import DebtCreate, DebtUpdate
+from app.services.plan_cache import plan_cache
 from datetime import datetime
 
 class DebtService:
@@ -15,6 +16,7 @@ class DebtService:
             **debt_data.model_dump()
         )
         await debt.insert()
+        await plan_cache.invalidate_user(clerk_user_id)
         return debt
     
     @staticmethod
@@ -54,6 +56,7 @@ class DebtService:
             setattr(debt, field, value)
         
         await debt.save()
+        await plan_cache.invalidate_user(clerk_user_id)
         return debt
     
     @staticmethod
@@ -66,6 +69,7 @@ class DebtService:
         debt.is_active = False
         debt.updated_at = datetime.utcnow()
         await debt.save()
+        await plan_cache.invalidate_user(clerk_user_id)
         return True
     
     @staticmethod
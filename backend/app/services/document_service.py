@@ -1,19 +1,22 @@
 # app/services/document_service.py (complete updated implementation)
+import asyncio
+import hashlib
 import io
 import os
 import tempfile
 from typing import List, Dict, Any, Optional, Tuple
-import pandas as pd
 import pdfplumber
 from fastapi import UploadFile, HTTPException
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_groq import ChatGroq
 
 # Import your settings
 from app.config.settings import settings
+from app.services.llm_client import llm_client
+from app.utils.single_flight import single_flight
 
 class DocumentService:
+    SUMMARY_SYSTEM_PROMPT = "You are a concise financial document summarizer. Extract key numbers, dates, and action items."
+    
     def __init__(self):
         # Use settings instead of os.getenv()
         self.groq_api_key = settings.GROQ_API_KEY
@@ -22,13 +25,9 @@ class DocumentService:
         if not self.groq_api_key or self.groq_api_key == "test_groq_key":
             raise ValueError("Valid GROQ_API_KEY is required in settings")
     
-    def _get_llm(self):
-        """Initialize and return LLM"""
-        return ChatGroq(
-            model=self.llm_model,
-            groq_api_key=self.groq_api_key,
-            temperature=0.2
-        )
+    async def _complete(self, messages: List[Dict[str, str]]) -> str:
+        """Chat completion through the shared pooled LLM client"""
+        return await llm_client.chat_completion(messages, model=self.llm_model, temperature=0.2)
     
     def _extract_text_from_file(self, file_content: bytes, filename: str) -> str:
         """Extract text from uploaded file based on file type"""
@@ -64,6 +63,7 @@ class DocumentService:
     def _extract_csv_text(self, file_content: bytes) -> str:
         """Extract text from CSV file"""
         try:
+            import pandas as pd  # only needed for tabular uploads
             df = pd.read_csv(io.BytesIO(file_content))
             return df.to_string(index=False)
         except Exception as e:
@@ -72,6 +72,7 @@ class DocumentService:
     def _extract_excel_text(self, file_content: bytes) -> str:
         """Extract text from Excel file"""
         try:
+            import pandas as pd
             df = pd.read_excel(io.BytesIO(file_content))
             return df.to_string(index=False)
         except Exception as e:
@@ -85,7 +86,7 @@ class DocumentService:
         )
         return splitter.split_text(text)
     
-    async def summarize_documents(self, files: List[UploadFile]) -> str:
+    async def summarize_documents(self, files: List[UploadFile], clerk_user_id: Optional[str] = None) -> str:
         """Generate AI summary of uploaded documents"""
         if not files:
             raise HTTPException(status_code=400, detail="No files provided")
@@ -94,7 +95,8 @@ class DocumentService:
         for file in files:
             try:
                 content = await file.read()
-                text = self._extract_text_from_file(content, file.filename)
+                # pdfplumber/pandas parsing is CPU-bound; keep it off the event loop
+                text = await asyncio.to_thread(self._extract_text_from_file, content, file.filename)
                 texts.append(f"=== {file.filename} ===\n{text}")
                 await file.seek(0)
             except Exception as e:
@@ -105,54 +107,76 @@ class DocumentService:
         if not all_text.strip():
             return "No text could be extracted from the uploaded files."
         
-        chunks = self._chunk_text(all_text)
-        llm = self._get_llm()
-        system_prompt = "You are a concise financial document summarizer. Extract key numbers, dates, and action items."
-        
-        if len(chunks) == 1:
-            messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=f"Summarize this financial document:\n\n{chunks[0]}")
-            ]
+        # The same upload submitted again while it is being summarized waits for that summary
+        digest = hashlib.sha256(all_text.encode("utf-8")).hexdigest()
+        return await single_flight.do(("summarize", clerk_user_id, digest), lambda: self._summarize_text(all_text))
+    
+    async def _summarize_part(self, semaphore: asyncio.Semaphore, instruction: str, text: str) -> str:
+        messages = [
+            {"role": "system", "content": self.SUMMARY_SYSTEM_PROMPT},
+            {"role": "user", "content": f"{instruction}:\n\n{text}"}
+        ]
+        async with semaphore:
             try:
-                response = llm.invoke(messages)
-                return response.content
+                return await self._complete(messages)
             except Exception as e:
                 return f"LLM error: {str(e)}"
-        else:
-            partial_summaries = []
-            for chunk in chunks:
-                messages = [
-                    SystemMessage(content=system_prompt),
-                    HumanMessage(content=f"Summarize this part:\n\n{chunk}")
-                ]
-                try:
-                    response = llm.invoke(messages)
-                    partial_summaries.append(response.content)
-                except Exception as e:
-                    partial_summaries.append(f"LLM error: {str(e)}")
-            
-            combined_text = "\n\n".join(partial_summaries)
-            final_messages = [
-                SystemMessage(content=system_prompt),
-                HumanMessage(content=f"Combine these partial summaries into one concise summary:\n\n{combined_text}")
-            ]
-            
-            try:
-                final_response = llm.invoke(final_messages)
-                return final_response.content
-            except Exception as e:
-                return f"LLM error combining summaries: {str(e)}"
+    
+    def _reduce_groups(self, summaries: List[str]) -> List[List[str]]:
+        """Pack consecutive summaries into groups whose combined text fits one reduce call"""
+        groups: List[List[str]] = [[]]
+        size = 0
+        for summary in summaries:
+            if groups[-1] and size + len(summary) > settings.DOC_SUMMARY_REDUCE_MAX_CHARS:
+                groups.append([])
+                size = 0
+            groups[-1].append(summary)
+            size += len(summary) + 2
+        return groups
+    
+    async def _summarize_text(self, all_text: str) -> str:
+        """
+        Map-reduce summary: chunk summaries run concurrently (at most DOC_SUMMARY_CONCURRENCY
+        LLM calls at a time), then partial summaries are combined in rounds until they fit
+        into a single final combine call.
+        """
+        chunks = self._chunk_text(all_text)
+        semaphore = asyncio.Semaphore(settings.DOC_SUMMARY_CONCURRENCY)
+        
+        if len(chunks) == 1:
+            return await self._summarize_part(semaphore, "Summarize this financial document", chunks[0])
+        
+        # Map: gather keeps the summaries in document order
+        summaries = await asyncio.gather(*[
+            self._summarize_part(semaphore, "Summarize this part", chunk) for chunk in chunks
+        ])
+        
+        # Reduce: combine neighbouring summaries level by level for very long documents
+        groups = self._reduce_groups(summaries)
+        while len(groups) > 1:
+            summaries = await asyncio.gather(*[
+                self._summarize_part(semaphore, "Combine these partial summaries into one concise summary", "\n\n".join(group))
+                for group in groups
+            ])
+            next_groups = self._reduce_groups(summaries)
+            if len(next_groups) >= len(groups):
+                break  # summaries are not getting shorter; combine what we have
+            groups = next_groups
+        
+        return await self._summarize_part(
+            semaphore, "Combine these partial summaries into one concise summary", "\n\n".join(summaries)
+        )
     
     async def analyze_documents(
         self, 
         files: List[UploadFile], 
         analysis_type: str,
-        focus_areas: Optional[List[str]] = None
+        focus_areas: Optional[List[str]] = None,
+        clerk_user_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """Perform focused analysis on documents"""
         
-        summary = await self.summarize_documents(files)
+        summary = await self.summarize_documents(files, clerk_user_id)
         
         focus_prompt = f"""
         Based on the document summary provided, perform a {analysis_type.lower()} analysis.
@@ -175,14 +199,6 @@ class DocumentService:
         Keep the analysis practical and actionable for debt management.
         """
         
-        llm = self._get_llm()
-        
-        try:
-            analysis_response = llm.invoke([HumanMessage(content=focus_prompt)])
-            focused_analysis = analysis_response.content
-        except Exception as e:
-            focused_analysis = f"Enhanced analysis unavailable: {str(e)}"
-        
         action_prompt = f"""
         Based on this financial document analysis, suggest 3-5 specific, actionable steps the user should take:
         
@@ -197,11 +213,16 @@ class DocumentService:
         Format as a numbered list with brief explanations.
         """
         
-        try:
-            action_response = llm.invoke([HumanMessage(content=action_prompt)])
-            action_items = action_response.content
-        except Exception as e:
-            action_items = f"Action items unavailable: {str(e)}"
+        # Both prompts only depend on the summary, so run them concurrently
+        focused_analysis, action_items = await asyncio.gather(
+            self._complete([{"role": "user", "content": focus_prompt}]),
+            self._complete([{"role": "user", "content": action_prompt}]),
+            return_exceptions=True
+        )
+        if isinstance(focused_analysis, Exception):
+            focused_analysis = f"Enhanced analysis unavailable: {str(focused_analysis)}"
+        if isinstance(action_items, Exception):
+            action_items = f"Action items unavailable: {str(action_items)}"
         
         return {
             "summary": summary,
@@ -425,16 +425,20 @@
 #         return []
 
 # app/services/education_service.py
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple
 from datetime import datetime
+from app.models.chat import ChatMessage
 from app.services.llm_service import LLMService
 from app.services.debt_service import DebtService
 from app.services.plan_service import PlanService
 from app.services.scenario_service import ScenarioService
 from app.models.user import User
+from app.utils.sse import sse_event
 
 class EducationService:
     
+    FALLBACK_RESPONSE = "I'm here to help with your financial questions! Ask me about budgeting, debt management, investments, or any other money-related topics. I can also provide personalized advice based on your current financial situation."
+    
     @staticmethod
     def _check_inappropriate_content(message: str) -> bool:
         """Check if message contains inappropriate content"""
@@ -641,79 +645,109 @@ class EducationService:
         return final_context
     
     @staticmethod
-    async def get_financial_education_response(
-        user_question: str,
-        clerk_user_id: str,
-        conversation_history: List[Dict] = None
-    ) -> Dict[str, Any]:
-        
+    def _quick_response(user_question: str) -> Optional[str]:
+        """Canned replies that never need the LLM"""
         # Handle inappropriate content
         if EducationService._check_inappropriate_content(user_question):
-            return {
-                "success": True,
-                "response": "you son of a bitch go and fuck ur self , and it is not avlable it is avialable",
-                "timestamp": datetime.utcnow().isoformat()
-            }
+            return "you son of a bitch go and fuck ur self , and it is not avlable it is avialable"
         
         # Handle basic greetings
         greetings = ['hi', 'hello', 'hey', 'good morning', 'good afternoon', 'good evening']
         if user_question.lower().strip() in greetings:
+            return "Hello! I'm your financial advisor assistant. I can help you with budgeting, debt management, investments, credit scores, and financial planning. I also have access to your current financial data, so feel free to ask about your debts, repayment plans, or scenarios!"
+        return None
+    
+    @staticmethod
+    async def _build_prompt(user_question: str, clerk_user_id: str) -> Tuple[str, bool]:
+        """Prompt for the LLM and whether it embeds the user's financial data"""
+        # Detect if user is asking about their financial data
+        data_needs = EducationService._detect_data_request(user_question)
+        financial_context = ""
+        
+        # Fetch relevant financial data if needed
+        if any(data_needs.values()):
+            financial_data = await EducationService._fetch_user_financial_data(clerk_user_id, data_needs)
+            financial_context = await EducationService._format_financial_context(financial_data)
+        
+        # Build the prompt with context
+        prompt = f"""
+        You are a helpful assistant with expertise in personal finance.
+        
+        User question: {user_question}
+        """
+        
+        # Add financial context if available
+        if financial_context:
+            prompt += f"""
+            
+        IMPORTANT - USER'S CURRENT FINANCIAL DATA:
+        {financial_context}
+        
+        Use this data to provide personalized advice. Reference specific amounts, debts, and plans when relevant.
+        """
+        
+        prompt += """
+        Instructions:
+        - If the question is about finance, money, budgeting, investing, debt, credit, loans, savings, etc. - provide helpful financial advice for someone in India
+        - If user asks about their current financial situation, use the provided financial data
+        - If user asks about repayment strategies, explain the available options (avalanche, snowball, optimal)
+        - If user asks about what-if scenarios, explain the types of analysis available
+        - If the question is NOT about finance (like math, general questions, etc.) - answer briefly and then suggest how I can help with financial topics
+        - Write in a conversational chat style with no markdown formatting
+        - Keep responses concise and helpful
+        - Use ₹ currency when discussing money
+        - Be professional and friendly
+        - If you reference their financial data, be specific about amounts and details
+        
+        Answer the user's question directly and helpfully.
+        """
+        
+        return prompt, bool(financial_context)
+    
+    @staticmethod
+    def _cache_scope(user_question: str, clerk_user_id: str, used_financial_data: bool) -> Dict[str, Any]:
+        """LLM cache scope: answers built on the user's data stay private, generic ones are shared"""
+        if used_financial_data:
+            return {"user_id": clerk_user_id}
+        return {"question": user_question.strip()}
+    
+    @staticmethod
+    async def _save_exchange(clerk_user_id: str, user_question: str, response: str, used_financial_data: bool) -> None:
+        try:
+            await ChatMessage.insert_many([
+                ChatMessage(clerk_user_id=clerk_user_id, role="user", content=user_question),
+                ChatMessage(clerk_user_id=clerk_user_id, role="assistant", content=response,
+                            used_financial_data=used_financial_data)
+            ])
+        except Exception as e:
+            print(f"Error saving chat messages: {e}")
+    
+    @staticmethod
+    async def get_financial_education_response(
+        user_question: str,
+        clerk_user_id: str,
+        conversation_history: List[Dict] = None
+    ) -> Dict[str, Any]:
+        
+        quick_response = EducationService._quick_response(user_question)
+        if quick_response is not None:
             return {
                 "success": True,
-                "response": "Hello! I'm your financial advisor assistant. I can help you with budgeting, debt management, investments, credit scores, and financial planning. I also have access to your current financial data, so feel free to ask about your debts, repayment plans, or scenarios!",
+                "response": quick_response,
                 "timestamp": datetime.utcnow().isoformat()
             }
         
         try:
-            # Detect if user is asking about their financial data
-            data_needs = EducationService._detect_data_request(user_question)
-            financial_context = ""
-            
-            # Fetch relevant financial data if needed
-            if any(data_needs.values()):
-                financial_data = await EducationService._fetch_user_financial_data(clerk_user_id, data_needs)
-                financial_context = await EducationService._format_financial_context(financial_data)
-            
-            # Build the prompt with context
-            prompt = f"""
-            You are a helpful assistant with expertise in personal finance.
-            
-            User question: {user_question}
-            """
-            
-            # Add financial context if available
-            if financial_context:
-                prompt += f"""
-                
-            IMPORTANT - USER'S CURRENT FINANCIAL DATA:
-            {financial_context}
-            
-            Use this data to provide personalized advice. Reference specific amounts, debts, and plans when relevant.
-            """
-            
-            prompt += """
-            Instructions:
-            - If the question is about finance, money, budgeting, investing, debt, credit, loans, savings, etc. - provide helpful financial advice for someone in India
-            - If user asks about their current financial situation, use the provided financial data
-            - If user asks about repayment strategies, explain the available options (avalanche, snowball, optimal)
-            - If user asks about what-if scenarios, explain the types of analysis available
-            - If the question is NOT about finance (like math, general questions, etc.) - answer briefly and then suggest how I can help with financial topics
-            - Write in a conversational chat style with no markdown formatting
-            - Keep responses concise and helpful
-            - Use ₹ currency when discussing money
-            - Be professional and friendly
-            - If you reference their financial data, be specific about amounts and details
-            
-            Answer the user's question directly and helpfully.
-            """
-            
-            ai_response = await LLMService.generate_credit_advice(prompt, model="llama-3.3-70b-versatile")
+            prompt, used_financial_data = await EducationService._build_prompt(user_question, clerk_user_id)
+            ai_response = await LLMService.generate_credit_advice(
+                prompt, model="llama-3.3-70b-versatile", **EducationService._cache_scope(user_question, clerk_user_id, used_financial_data)
+            )
             
             return {
                 "success": True,
                 "response": ai_response,
                 "timestamp": datetime.utcnow().isoformat(),
-                "used_financial_data": bool(financial_context)
+                "used_financial_data": used_financial_data
             }
             
         except Exception as e:
@@ -721,10 +755,49 @@ class EducationService:
             
             return {
                 "success": True,
-                "response": "I'm here to help with your financial questions! Ask me about budgeting, debt management, investments, or any other money-related topics. I can also provide personalized advice based on your current financial situation.",
+                "response": EducationService.FALLBACK_RESPONSE,
                 "timestamp": datetime.utcnow().isoformat()
             }
     
+    @staticmethod
+    async def stream_financial_education_response(
+        user_question: str,
+        clerk_user_id: str,
+        conversation_history: List[Dict] = None
+    ) -> AsyncIterator[str]:
+        """
+        Server-sent events for the chat answer: one "token" event per streamed delta, then a
+        "done" event with the full response. The exchange is saved once the stream completes.
+        """
+        quick_response = EducationService._quick_response(user_question)
+        if quick_response is not None:
+            yield sse_event("token", {"delta": quick_response})
+            yield sse_event("done", {"response": quick_response, "timestamp": datetime.utcnow().isoformat()})
+            return
+        
+        try:
+            prompt, used_financial_data = await EducationService._build_prompt(user_question, clerk_user_id)
+        except Exception as e:
+            print(f"Education service error: {e}")
+            yield sse_event("token", {"delta": EducationService.FALLBACK_RESPONSE})
+            yield sse_event("done", {"response": EducationService.FALLBACK_RESPONSE, "timestamp": datetime.utcnow().isoformat()})
+            return
+        
+        parts = []
+        async for delta in LLMService.stream_credit_advice(
+            prompt, model="llama-3.3-70b-versatile", **EducationService._cache_scope(user_question, clerk_user_id, used_financial_data)
+        ):
+            parts.append(delta)
+            yield sse_event("token", {"delta": delta})
+        
+        ai_response = "".join(parts)
+        await EducationService._save_exchange(clerk_user_id, user_question, ai_response, used_financial_data)
+        yield sse_event("done", {
+            "response": ai_response,
+            "timestamp": datetime.utcnow().isoformat(),
+            "used_financial_data": used_financial_data
+        })
+    
     @staticmethod
     async def get_suggested_topics():
         return [
@@ -0,0 +1,42 @@
+# app/services/embedding_client.py
+from typing import List, Optional
+import httpx
+from app.config.settings import settings
+
+class EmbeddingClient:
+    """
+    Pooled client for the Ollama embedding API. One POST to /api/embed embeds a whole list
+    of texts, and the connection is kept alive between calls.
+    """
+
+    def __init__(self, base_url: str, model: str, timeout_seconds: float,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.timeout_seconds = timeout_seconds
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout_seconds, transport=self.transport)
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        response = await self.client.post("/api/embed", json={"model": self.model, "input": texts})
+        response.raise_for_status()
+        return response.json()["embeddings"]
+
+embedding_client = EmbeddingClient(
+    base_url=settings.OLLAMA_BASE_URL,
+    model=settings.EMBEDDING_MODEL,
+    timeout_seconds=settings.EMBEDDING_TIMEOUT_SECONDS
+)
@@ -0,0 +1,127 @@
+# app/services/llm_cache.py
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+from app.config.settings import settings
+from app.services.embedding_client import embedding_client
+from app.utils.cache import TTLCache
+
+class LLMResponseCache:
+    """
+    Two-tier cache for LLM completions.
+
+    The exact tier hashes everything that shapes the answer (model, system prompt, user prompt,
+    sampling options). Prompts that embed a user's financial data are keyed with that user's id,
+    so a response can never be served to someone else.
+
+    The optional semantic tier serves generic questions only: the question is embedded and a
+    stored answer is reused when its question is at least `similarity_threshold` cosine-similar
+    and was asked under the same model, system prompt and options. The question's vector is
+    kept between a semantic miss and the following set, so a miss costs one embedding call.
+    """
+
+    def __init__(self, enabled: bool, max_entries: int, ttl_seconds: float, semantic_enabled: bool,
+                 semantic_max_entries: int, similarity_threshold: float):
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.semantic_enabled = semantic_enabled
+        self.semantic_max_entries = semantic_max_entries
+        self.similarity_threshold = similarity_threshold
+        self._exact = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        # namespace -> {question: (expires_at, unit vector, response)}, in LRU order
+        self._semantic: Dict[str, "OrderedDict[str, Tuple[float, np.ndarray, str]]"] = {}
+        # question -> unit vector, from a semantic lookup until the answer is stored
+        self._pending_vectors = TTLCache(max_entries=256, ttl_seconds=ttl_seconds)
+
+    @staticmethod
+    def _hash(payload: Dict[str, Any]) -> str:
+        blob = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def make_key(model: str, system_prompt: str, prompt: str, options: Dict[str, Any],
+                 user_id: Optional[str] = None) -> str:
+        return LLMResponseCache._hash({
+            "model": model, "system": system_prompt, "prompt": prompt, "options": options, "user": user_id
+        })
+
+    @staticmethod
+    def make_namespace(model: str, system_prompt: str, options: Dict[str, Any]) -> str:
+        return LLMResponseCache._hash({"model": model, "system": system_prompt, "options": options})
+
+    async def _embed(self, text: str) -> Optional[np.ndarray]:
+        vector = self._pending_vectors.get(text)
+        if vector is not None:
+            return vector
+        try:
+            vector = np.asarray((await embedding_client.embed([text]))[0], dtype=float)
+        except Exception as e:
+            print(f"LLM semantic cache embedding error: {e}")
+            return None
+        norm = np.linalg.norm(vector)
+        if norm <= 0:
+            return None
+        vector = vector / norm
+        self._pending_vectors.set(text, vector)
+        return vector
+
+    async def get(self, key: str, namespace: Optional[str] = None, question: Optional[str] = None) -> Optional[str]:
+        """Exact hit on `key`, else (for generic questions) the closest semantic match in `namespace`"""
+        if not self.enabled:
+            return None
+        value = self._exact.get(key)
+        if value is not None or not (self.semantic_enabled and namespace and question):
+            return value
+
+        entries = self._semantic.get(namespace)
+        if not entries:
+            return None
+        now = time.monotonic()
+        for q in [q for q, (expires_at, _, _) in entries.items() if expires_at <= now]:
+            del entries[q]
+        if not entries:
+            return None
+        vector = await self._embed(question)
+        if vector is None:
+            return None
+        questions = list(entries.keys())
+        similarity = np.stack([entries[q][1] for q in questions]) @ vector
+        best = int(np.argmax(similarity))
+        if similarity[best] < self.similarity_threshold:
+            return None
+        entries.move_to_end(questions[best])
+        print(f"LLM semantic cache hit ({similarity[best]:.3f})")
+        return entries[questions[best]][2]
+
+    async def set(self, key: str, response: str, namespace: Optional[str] = None, question: Optional[str] = None) -> None:
+        if not self.enabled:
+            return
+        self._exact.set(key, response)
+        if not (self.semantic_enabled and namespace and question):
+            return
+        vector = await self._embed(question)
+        self._pending_vectors.delete(question)
+        if vector is None:
+            return
+        entries = self._semantic.setdefault(namespace, OrderedDict())
+        entries[question] = (time.monotonic() + self.ttl_seconds, vector, response)
+        entries.move_to_end(question)
+        while len(entries) > self.semantic_max_entries:
+            entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._exact.clear()
+        self._semantic.clear()
+        self._pending_vectors.clear()
+
+llm_cache = LLMResponseCache(
+    enabled=settings.LLM_CACHE_ENABLED,
+    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+    semantic_enabled=settings.LLM_SEMANTIC_CACHE_ENABLED,
+    semantic_max_entries=settings.LLM_SEMANTIC_CACHE_MAX_ENTRIES,
+    similarity_threshold=settings.LLM_SEMANTIC_CACHE_THRESHOLD
+)
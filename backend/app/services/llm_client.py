@@ -0,0 +1,186 @@
+# app/services/llm_client.py
+import asyncio
+import json
+import random
+from typing import Any, AsyncIterator, Dict, List, Optional
+import httpx
+from app.config.settings import settings
+
+RETRY_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+class LLMClientError(RuntimeError):
+    """Raised when the chat completions API fails after all retries"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401  (installed by httpx[http2])
+        return True
+    except ImportError:
+        return False
+
+class LLMClient:
+    """
+    One long-lived, pooled HTTP client for the OpenAI-compatible chat completions API (Groq).
+
+    Connections are kept alive between requests (over HTTP/2 when `h2` is installed), so only
+    the first call per connection pays the TCP/TLS handshake. Transport errors and retryable
+    status codes are retried with full-jitter exponential backoff, honouring Retry-After.
+    Point `base_url` at a local stub server (or pass an httpx `transport`) to test without Groq.
+    """
+
+    def __init__(self, base_url: str, api_key: str, timeout_seconds: float, connect_timeout_seconds: float,
+                 max_connections: int, max_keepalive_connections: int, keepalive_expiry_seconds: float,
+                 http2: bool, max_retries: int, backoff_seconds: float, backoff_max_seconds: float,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = httpx.Timeout(timeout_seconds, connect=connect_timeout_seconds)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry_seconds
+        )
+        self.http2 = http2
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            http2 = self.http2 and _http2_available()
+            if self.http2 and not http2:
+                print("LLM client: h2 is not installed, using HTTP/1.1 keep-alive")
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=http2,
+                transport=self.transport
+            )
+        return self._client
+
+    def start(self) -> None:
+        """Create the connection pool ahead of the first request"""
+        _ = self.client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _headers(self) -> Dict[str, str]:
+        if not self.api_key:
+            raise ValueError("GROQ_API_KEY not found in settings")
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max_seconds)
+            except ValueError:
+                pass
+        # full jitter: uniform over [0, base * 2^attempt], capped
+        return random.uniform(0.0, min(self.backoff_max_seconds, self.backoff_seconds * (2 ** attempt)))
+
+    async def post(self, path: str, payload: Dict[str, Any], max_retries: Optional[int] = None) -> httpx.Response:
+        """POST with retries; returns the successful response or raises LLMClientError"""
+        retries = self.max_retries if max_retries is None else max_retries
+        headers = self._headers()
+        attempt = 0
+        while True:
+            try:
+                response = await self.client.post(path, headers=headers, json=payload)
+            except httpx.TransportError as e:
+                await self._retry_or_raise(attempt, retries, None, e)
+            else:
+                if response.status_code == 200:
+                    return response
+                await self._retry_or_raise(attempt, retries, response)
+            attempt += 1
+
+    async def _retry_or_raise(self, attempt: int, retries: int, response: Optional[httpx.Response],
+                              error: Optional[Exception] = None) -> None:
+        """Sleep before the next attempt, or raise LLMClientError when the failure is final"""
+        if attempt >= retries or (response is not None and response.status_code not in RETRY_STATUS_CODES):
+            if response is not None:
+                raise LLMClientError(
+                    f"Groq API error: {response.status_code} - {response.text}",
+                    status_code=response.status_code
+                )
+            raise LLMClientError(f"Groq API transport error: {type(error).__name__}: {error}") from error
+        delay = self._backoff(attempt, response)
+        print(f"LLM request failed (attempt {attempt + 1}), retrying in {delay:.2f}s")
+        await asyncio.sleep(delay)
+
+    async def chat_completion(self, messages: List[Dict[str, str]], model: str, temperature: float = 0.7,
+                              max_tokens: int = 2000, max_retries: Optional[int] = None, **options: Any) -> str:
+        """Content of the first choice of a non-streaming chat completion"""
+        payload = {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens, **options}
+        response = await self.post("/chat/completions", payload, max_retries=max_retries)
+        return response.json()["choices"][0]["message"]["content"]
+
+    async def stream_chat_completion(self, messages: List[Dict[str, str]], model: str, temperature: float = 0.7,
+                                     max_tokens: int = 2000, max_retries: Optional[int] = None,
+                                     **options: Any) -> AsyncIterator[str]:
+        """
+        Yield content deltas of a streaming chat completion as the provider emits them.
+        Failures are only retried before the first delta; once text has been yielded a
+        failure raises LLMClientError, since replaying the request would repeat it.
+        """
+        retries = self.max_retries if max_retries is None else max_retries
+        payload = {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens,
+                   "stream": True, **options}
+        headers = self._headers()
+        attempt = 0
+        started = False
+        while True:
+            try:
+                async with self.client.stream("POST", "/chat/completions", headers=headers, json=payload) as response:
+                    if response.status_code != 200:
+                        await response.aread()
+                    else:
+                        async for line in response.aiter_lines():
+                            # server-sent events: "data: {chunk}" lines, terminated by "data: [DONE]"
+                            if not line.startswith("data:"):
+                                continue
+                            data = line[len("data:"):].strip()
+                            if data == "[DONE]":
+                                return
+                            choices = json.loads(data).get("choices") or [{}]
+                            delta = (choices[0].get("delta") or {}).get("content")
+                            if delta:
+                                started = True
+                                yield delta
+                        return
+            except httpx.TransportError as e:
+                if started:
+                    raise LLMClientError(f"Groq API stream interrupted: {type(e).__name__}: {e}") from e
+                await self._retry_or_raise(attempt, retries, None, e)
+            else:
+                await self._retry_or_raise(attempt, retries, response)
+            attempt += 1
+
+llm_client = LLMClient(
+    base_url=settings.LLM_BASE_URL,
+    api_key=settings.GROQ_API_KEY,
+    timeout_seconds=settings.LLM_TIMEOUT_SECONDS,
+    connect_timeout_seconds=settings.LLM_CONNECT_TIMEOUT_SECONDS,
+    max_connections=settings.LLM_MAX_CONNECTIONS,
+    max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry_seconds=settings.LLM_KEEPALIVE_EXPIRY_SECONDS,
+    http2=settings.LLM_HTTP2,
+    max_retries=settings.LLM_MAX_RETRIES,
+    backoff_seconds=settings.LLM_RETRY_BACKOFF_SECONDS,
+    backoff_max_seconds=settings.LLM_RETRY_BACKOFF_MAX_SECONDS
+)
@@ -170,76 +170,29 @@
 
 # app/services/llm_service.py
 import os
-import httpx
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, AsyncIterator, List, Optional
 import json
 from app.config.settings import settings
+from app.services.llm_client import llm_client, LLMClientError
+from app.services.llm_cache import llm_cache
+from app.utils.single_flight import single_flight
 
 
 class LLMService:
     """Service for interacting with Groq API for AI-powered financial advice"""
     
-    BASE_URL = "https://api.groq.com/openai/v1"
+    BASE_URL = settings.LLM_BASE_URL
     
-    @staticmethod
-    def _get_headers() -> Dict[str, str]:
-        """Get headers for Groq API requests"""
-        api_key = settings.GROQ_API_KEY  # Use settings instead of os.getenv
-        if not api_key:
-            raise ValueError("GROQ_API_KEY not found in settings")
-        
-        return {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
-    
-    @staticmethod
-    async def generate_credit_advice(prompt: str, model: str = "llama-3.3-70b-versatile") -> str:
-        """Generate credit improvement advice using Groq API"""
-        
-        system_prompt = """You are a knowledgeable and helpful credit counselor. 
+    SYSTEM_PROMPT = """You are a knowledgeable and helpful credit counselor. 
         Provide practical, actionable advice for improving credit scores.
         Be specific with numbers, timelines, and steps.
         Focus on realistic expectations and proven strategies.
         Keep advice encouraging but honest about the time and effort required.
         Structure your response clearly with headers and bullet points."""
-        
-        # Debug logging
-        print(f"Using API key: {settings.GROQ_API_KEY[:10]}..." if settings.GROQ_API_KEY else "No API key found")
-        
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    f"{LLMService.BASE_URL}/chat/completions",
-                    headers=LLMService._get_headers(),
-                    json={
-                        "model": model,
-                        "messages": [
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": prompt}
-                        ],
-                        "temperature": 0.7,
-                        "max_tokens": 2000,
-                        "top_p": 0.9
-                    }
-                )
-                
-                print(f"Groq API Status Code: {response.status_code}")
-                
-                if response.status_code != 200:
-                    print(f"Groq API Error Response: {response.text}")
-                    raise Exception(f"Groq API error: {response.status_code} - {response.text}")
-                
-                result = response.json()
-                return result["choices"][0]["message"]["content"]
-                
-        except Exception as e:
-            print(f"Full exception details: {type(e).__name__}: {str(e)}")
-            if hasattr(e, 'response'):
-                print(f"HTTP Response: {e.response.status_code} - {e.response.text}")
-            
-            # Fallback response
-            return f"""
+    
+    COMPLETION_OPTIONS = {"temperature": 0.7, "max_tokens": 2000, "top_p": 0.9}
+    
+    FALLBACK_ADVICE = """
 **Credit Improvement Plan**
 
 Based on your profile, here are the key recommendations:
@@ -266,6 +219,97 @@ With consistent effort, you could see 50-100 point improvement over 6-12 months.
 Note: AI service temporarily unavailable, showing fallback recommendations.
 """
     
+    @staticmethod
+    def _cache_lookup_args(prompt: str, model: str, user_id: Optional[str], question: Optional[str]):
+        """
+        Exact-tier key, plus the semantic namespace/question for generic questions.
+        user_id marks a prompt that embeds that user's data: it is keyed per user and never matched semantically.
+        """
+        key = llm_cache.make_key(model, LLMService.SYSTEM_PROMPT, prompt, LLMService.COMPLETION_OPTIONS, user_id)
+        if user_id is not None or question is None:
+            return key, None, None
+        return key, llm_cache.make_namespace(model, LLMService.SYSTEM_PROMPT, LLMService.COMPLETION_OPTIONS), question
+    
+    @staticmethod
+    async def generate_credit_advice(
+        prompt: str,
+        model: str = "llama-3.3-70b-versatile",
+        user_id: Optional[str] = None,
+        question: Optional[str] = None
+    ) -> str:
+        """
+        Generate credit improvement advice using Groq API.
+        Pass user_id when the prompt contains that user's financial data, or the bare
+        question for generic prompts that may be answered from a similar cached question.
+        """
+        key, namespace, question = LLMService._cache_lookup_args(prompt, model, user_id, question)
+        cached = await llm_cache.get(key, namespace, question)
+        if cached is not None:
+            return cached
+        
+        async def complete() -> str:
+            # Debug logging
+            print(f"Using API key: {settings.GROQ_API_KEY[:10]}..." if settings.GROQ_API_KEY else "No API key found")
+            
+            try:
+                # Shared pooled client: keep-alive connections, timeouts and retries live in LLMClient
+                response = await llm_client.chat_completion(
+                    [
+                        {"role": "system", "content": LLMService.SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt}
+                    ],
+                    model=model,
+                    **LLMService.COMPLETION_OPTIONS
+                )
+                    
+            except Exception as e:
+                print(f"Full exception details: {type(e).__name__}: {str(e)}")
+                
+                # Fallback response (never cached)
+                return LLMService.FALLBACK_ADVICE
+            
+            await llm_cache.set(key, response, namespace, question)
+            return response
+        
+        # The cache key already covers user, model and prompt, so identical concurrent calls share one completion
+        return await single_flight.do(("llm", key), complete)
+    
+    @staticmethod
+    async def stream_credit_advice(
+        prompt: str,
+        model: str = "llama-3.3-70b-versatile",
+        user_id: Optional[str] = None,
+        question: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Same as generate_credit_advice, but yields the text as the API streams it"""
+        key, namespace, question = LLMService._cache_lookup_args(prompt, model, user_id, question)
+        cached = await llm_cache.get(key, namespace, question)
+        if cached is not None:
+            yield cached
+            return
+        
+        parts = []
+        try:
+            async for delta in llm_client.stream_chat_completion(
+                [
+                    {"role": "system", "content": LLMService.SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                model=model,
+                **LLMService.COMPLETION_OPTIONS
+            ):
+                parts.append(delta)
+                yield delta
+        except Exception as e:
+            print(f"Streaming exception details: {type(e).__name__}: {str(e)}")
+            # Text already sent cannot be taken back; only fall back if nothing was streamed
+            if not parts:
+                yield LLMService.FALLBACK_ADVICE
+            return
+        
+        # Only complete answers are cached
+        await llm_cache.set(key, "".join(parts), namespace, question)
+    
     @staticmethod
     async def analyze_debt_for_credit_impact(debts: List[Dict], user_profile: Dict) -> str:
         """Analyze how specific debts impact credit score"""
@@ -405,25 +449,33 @@ Note: AI service temporarily unavailable, showing fallback recommendations.
         """Test Groq API connection and return status"""
         
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(
-                    f"{LLMService.BASE_URL}/chat/completions",
-                    headers=LLMService._get_headers(),
-                    json={
-                        "model": "llama-3.3-70b-versatile",
-                        "messages": [{"role": "user", "content": "Hello"}],
-                        "max_tokens": 10
-                    }
-                )
-                
-                return {
-                    "success": response.status_code == 200,
-                    "status_code": response.status_code,
-                    "api_key_present": bool(settings.GROQ_API_KEY),
-                    "api_key_format": settings.GROQ_API_KEY.startswith('gsk_') if settings.GROQ_API_KEY else False,
-                    "response_text": response.text[:200] if response.status_code != 200 else "OK"
-                }
+            # No retries: this should report the API's state as it is right now
+            await llm_client.post(
+                "/chat/completions",
+                {
+                    "model": "llama-3.3-70b-versatile",
+                    "messages": [{"role": "user", "content": "Hello"}],
+                    "max_tokens": 10
+                },
+                max_retries=0
+            )
+            
+            return {
+                "success": True,
+                "status_code": 200,
+                "api_key_present": bool(settings.GROQ_API_KEY),
+                "api_key_format": settings.GROQ_API_KEY.startswith('gsk_') if settings.GROQ_API_KEY else False,
+                "response_text": "OK"
+            }
                 
+        except LLMClientError as e:
+            return {
+                "success": False,
+                "status_code": e.status_code,
+                "error": str(e),
+                "api_key_present": bool(settings.GROQ_API_KEY),
+                "api_key_format": settings.GROQ_API_KEY.startswith('gsk_') if settings.GROQ_API_KEY else False
+            }
         except Exception as e:
             return {
                 "success": False,
@@ -0,0 +1,111 @@
+# app/services/plan_cache.py
+import hashlib
+import json
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Type, TypeVar
+from pydantic import BaseModel
+from app.config.settings import settings
+from app.core.schemas import Debt as CoreDebt
+from app.models.plan_cache import PlanCacheEntry
+from app.utils.cache import TTLCache
+
+ResponseT = TypeVar("ResponseT", bound=BaseModel)
+
+class PlanCache:
+    """
+    Content-addressed cache for plan responses.
+
+    Keys hash the normalized core debts plus every plan input, so a cached response can never
+    outlive the data it was computed from. Entries are also tracked per user so that
+    DebtService can drop them eagerly when the user's debts change; keys the memory tier has
+    evicted or expired are swept from that index once it outgrows the cache. The Mongo tier is
+    optional and shared between workers.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, mongo_enabled: bool):
+        self.ttl_seconds = ttl_seconds
+        self.mongo_enabled = mongo_enabled
+        self._memory = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._user_keys: Dict[str, Set[str]] = defaultdict(set)
+        self._tracked = 0
+
+    @staticmethod
+    def make_key(kind: str, debts: List[CoreDebt], **inputs: Any) -> str:
+        """Stable hash of the normalized debts and plan inputs (budget, horizon, strategy, ...)"""
+        canonical = {
+            "kind": kind,
+            "debts": [[d.name, float(d.balance), float(d.apr), float(d.min_payment)] for d in debts],
+            "inputs": inputs,
+        }
+        blob = json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def _track(self, clerk_user_id: str, key: str) -> None:
+        keys = self._user_keys[clerk_user_id]
+        if key in keys:
+            return
+        keys.add(key)
+        self._tracked += 1
+        if self._tracked <= 2 * self._memory.max_entries:
+            return
+        # drop keys the memory tier no longer holds; amortized O(1) per tracked key
+        for user_id in list(self._user_keys):
+            live = {k for k in self._user_keys[user_id] if k in self._memory}
+            if live:
+                self._user_keys[user_id] = live
+            else:
+                del self._user_keys[user_id]
+        self._tracked = sum(len(keys) for keys in self._user_keys.values())
+
+    async def get(self, key: str, model: Type[ResponseT]) -> Optional[ResponseT]:
+        value = self._memory.get(key)
+        if value is not None:
+            return value
+        if not self.mongo_enabled:
+            return None
+        try:
+            entry = await PlanCacheEntry.find_one(PlanCacheEntry.key == key)
+        except Exception as e:
+            print(f"Plan cache read error: {e}")
+            return None
+        if entry is None or entry.expires_at <= datetime.utcnow():
+            return None
+        value = model.model_validate(entry.payload)
+        self._memory.set(key, value)
+        self._track(entry.clerk_user_id, key)
+        return value
+
+    async def set(self, clerk_user_id: str, key: str, value: BaseModel) -> None:
+        self._memory.set(key, value)
+        self._track(clerk_user_id, key)
+        if not self.mongo_enabled:
+            return
+        payload = value.model_dump(mode="json")
+        expires_at = datetime.utcnow() + timedelta(seconds=self.ttl_seconds)
+        try:
+            await PlanCacheEntry.find_one(PlanCacheEntry.key == key).upsert(
+                {"$set": {"payload": payload, "expires_at": expires_at}},
+                on_insert=PlanCacheEntry(key=key, clerk_user_id=clerk_user_id, payload=payload, expires_at=expires_at)
+            )
+        except Exception as e:
+            print(f"Plan cache write error: {e}")
+
+    async def invalidate_user(self, clerk_user_id: str) -> None:
+        """Drop every cached plan for a user, e.g. after their debts change"""
+        keys = self._user_keys.pop(clerk_user_id, set())
+        self._tracked -= len(keys)
+        for key in keys:
+            self._memory.delete(key)
+        if not self.mongo_enabled:
+            return
+        try:
+            await PlanCacheEntry.find(PlanCacheEntry.clerk_user_id == clerk_user_id).delete()
+        except Exception as e:
+            print(f"Plan cache invalidation error: {e}")
+
+plan_cache = PlanCache(
+    max_entries=settings.PLAN_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.PLAN_CACHE_TTL_SECONDS,
+    mongo_enabled=settings.PLAN_CACHE_MONGO_ENABLED
+)
@@ -1,19 +1,30 @@
-from typing import List, Optional, Dict, Any
+import json
+from typing import List, Optional, Dict, Any, Iterator, Set
+from collections import defaultdict
+from datetime import datetime
+from pymongo import UpdateOne
 from app.models.debt import Debt
 from app.models.user import User
+from app.models.plan import Plan
 from app.core.schemas import Debt as CoreDebt
-from app.core.optimization import (
-    compute_avalanche_plan,
-    compute_snowball_plan,
-    one_step_optimal_allocation
-)
-from app.core.plan_utils import plan_to_dataframe, simulate_total_balance_series
+from app.core.optimization import compute_plan_arrays, compute_plan_summary, iter_plan_months
+from app.core.array_engine import pad_debt_arrays, simulate_priority_batch
+from app.core.plan_utils import schedule_records
+from app.config.settings import settings
+from app.services.plan_cache import plan_cache
+from app.services.strategy_executor import strategy_executor
+from app.utils.single_flight import single_flight
 from app.schemas.plan import (
     RepaymentPlanRequest, RepaymentPlanResponse, 
-    StrategyComparisonResponse, AllocationResponse,
-    RepaymentMonthResponse, StrategyType
+    StrategyComparisonResponse, StrategyType, PLAN_DETAIL_FIELDS
 )
 
+STRATEGY_NAMES = {
+    StrategyType.AVALANCHE: "Debt Avalanche",
+    StrategyType.SNOWBALL: "Debt Snowball",
+    StrategyType.OPTIMAL: "Mathematical Optimal",
+}
+
 class PlanService:
     @staticmethod
     def _convert_db_debt_to_core(db_debt: Debt) -> CoreDebt:
@@ -26,51 +37,43 @@ class PlanService:
         )
 
     @staticmethod
-    def _convert_core_plan_to_response(plan, strategy_name: str, initial_debts: List[CoreDebt]) -> RepaymentPlanResponse:
-        """Convert core repayment plan to API response"""
-        # Convert schedule to DataFrame-like structure
-        df = plan_to_dataframe(plan)
-        schedule_data = df.to_dict('records') if not df.empty else []
-        
-        # Generate balance series
-        balance_series = simulate_total_balance_series(initial_debts, plan)
-        
-        # Convert months
-        months_response = []
-        for month in plan.months:
-            allocations = [
-                AllocationResponse(
-                    name=alloc.name,
-                    payment=alloc.payment,
-                    interest_accrued=alloc.interest_accrued,
-                    principal_reduction=alloc.principal_reduction
-                )
-                for alloc in month.allocations
-            ]
-            
-            months_response.append(RepaymentMonthResponse(
-                month_index=month.month_index,
-                allocations=allocations,
-                total_interest=month.total_interest,
-                total_paid=month.total_paid
-            ))
-        
-        return RepaymentPlanResponse(
-            strategy_name=strategy_name,
-            months=months_response,
-            total_interest_paid=plan.total_interest_paid,
-            months_to_debt_free=plan.months_to_debt_free,
-            schedule_df=schedule_data,
-            balance_series=balance_series
-        )
+    def parse_fields(fields: Optional[str]) -> Set[str]:
+        """Parse a comma-separated ?fields= value into the detail fields to include ("summary" selects none)"""
+        if not fields:
+            return set(PLAN_DETAIL_FIELDS)
+        if fields.strip() == "summary":
+            return set()
+        selected = {f.strip() for f in fields.split(",") if f.strip()}
+        unknown = selected - set(PLAN_DETAIL_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(PLAN_DETAIL_FIELDS)}")
+        return selected
 
     @staticmethod
-    async def generate_repayment_plan(
-        clerk_user_id: str, 
-        plan_request: RepaymentPlanRequest
+    def _convert_core_plan_to_response(
+        plan, 
+        strategy_name: str, 
+        fields: Optional[Set[str]] = None
     ) -> RepaymentPlanResponse:
-        """Generate repayment plan for user's actual debts"""
-        # Get user's debts
+        """Convert a core plan to API response, building only the requested detail fields (those need a columnar plan)"""
+        fields = set(PLAN_DETAIL_FIELDS) if fields is None else fields
+        response = {
+            "strategy_name": strategy_name,
+            "total_interest_paid": plan.total_interest_paid,
+            "months_to_debt_free": plan.months_to_debt_free
+        }
+        if "schedule_df" in fields:
+            response["schedule_df"] = schedule_records(plan)
+        if "balance_series" in fields:
+            response["balance_series"] = plan.balance_series.tolist()
+        if "months" in fields:
+            response["months"] = plan.nested_months()
+        
+        # One validation pass over plain dicts instead of an AllocationResponse per debt-month
+        return RepaymentPlanResponse.model_validate(response)
+
+    @staticmethod
+    async def _get_core_debts(clerk_user_id: str) -> List[CoreDebt]:
         user_debts = await Debt.find(
             Debt.clerk_user_id == clerk_user_id,
             Debt.is_active == True
@@ -79,65 +82,156 @@ class PlanService:
         if not user_debts:
             raise ValueError("No active debts found for user")
         
-        # Convert to core debt objects
-        core_debts = [PlanService._convert_db_debt_to_core(debt) for debt in user_debts]
-        
-        # Generate plan based on strategy
-        if plan_request.strategy == StrategyType.AVALANCHE:
-            plan = compute_avalanche_plan(core_debts, plan_request.monthly_budget, plan_request.max_months)
-            strategy_name = "Debt Avalanche"
-        elif plan_request.strategy == StrategyType.SNOWBALL:
-            plan = compute_snowball_plan(core_debts, plan_request.monthly_budget, plan_request.max_months)
-            strategy_name = "Debt Snowball"
-        else:  # OPTIMAL
-            plan = one_step_optimal_allocation(core_debts, plan_request.monthly_budget)
-            strategy_name = "Mathematical Optimal"
-        
-        return PlanService._convert_core_plan_to_response(plan, strategy_name, core_debts)
+        return [PlanService._convert_db_debt_to_core(debt) for debt in user_debts]
+
+    @staticmethod
+    def _plan_call(core_debts: List[CoreDebt], budget: float, max_months: int, strategy: str, summary_only: bool):
+        """(fn, args) for the strategy pool; summary-only plans skip the monthly schedule when the event engine is on"""
+        if summary_only and settings.PLAN_EVENT_ENGINE:
+            return compute_plan_summary, (core_debts, budget, max_months, strategy)
+        return compute_plan_arrays, (core_debts, budget, max_months, strategy)
+
+    @staticmethod
+    async def generate_repayment_plan(
+        clerk_user_id: str, 
+        plan_request: RepaymentPlanRequest,
+        fields: Optional[Set[str]] = None
+    ) -> RepaymentPlanResponse:
+        """Generate repayment plan for user's actual debts"""
+        core_debts = await PlanService._get_core_debts(clerk_user_id)
+        fields = set(PLAN_DETAIL_FIELDS) if fields is None else fields
+        
+        cache_key = plan_cache.make_key(
+            "generate", core_debts,
+            strategy=plan_request.strategy.value,
+            monthly_budget=plan_request.monthly_budget,
+            max_months=plan_request.max_months,
+            fields=sorted(fields)
+        )
+        cached = await plan_cache.get(cache_key, RepaymentPlanResponse)
+        if cached is not None:
+            return cached
+        
+        async def compute() -> RepaymentPlanResponse:
+            fn, args = PlanService._plan_call(
+                core_debts, plan_request.monthly_budget, plan_request.max_months, plan_request.strategy.value,
+                summary_only=not fields
+            )
+            plan = await strategy_executor.run(fn, *args)
+            strategy_name = STRATEGY_NAMES[plan_request.strategy]
+            
+            response = PlanService._convert_core_plan_to_response(plan, strategy_name, fields)
+            await plan_cache.set(clerk_user_id, cache_key, response)
+            return response
+        
+        # Identical concurrent requests (double clicks, re-renders) share one simulation
+        return await single_flight.do(("plan", clerk_user_id, cache_key), compute)
+
+    @staticmethod
+    async def stream_repayment_plan(
+        clerk_user_id: str, 
+        plan_request: RepaymentPlanRequest,
+        fields: Optional[Set[str]] = None
+    ) -> Iterator[str]:
+        """Fetch the user's debts and return an NDJSON line iterator that simulates the plan as it is consumed"""
+        core_debts = await PlanService._get_core_debts(clerk_user_id)
+        fields = set(PLAN_DETAIL_FIELDS) if fields is None else fields
+        return PlanService._plan_ndjson_lines(core_debts, plan_request, fields)
+
+    @staticmethod
+    def _plan_ndjson_lines(core_debts: List[CoreDebt], plan_request: RepaymentPlanRequest, fields: Set[str]) -> Iterator[str]:
+        """
+        One JSON object per line: a header, one line per simulated month, then the summary.
+        Month lines carry allocations when "months" is selected and the remaining total
+        balance when "balance_series" is selected; schedule_df has no streaming form.
+        """
+        names = [d.name for d in core_debts]
+        strategy_name = STRATEGY_NAMES[plan_request.strategy]
+        yield json.dumps({"type": "header", "strategy_name": strategy_name, "debts": names}) + "\n"
+        
+        total_interest = 0.0
+        months = 0
+        for payment, interest, balances in iter_plan_months(
+            core_debts, plan_request.monthly_budget, plan_request.max_months, plan_request.strategy.value
+        ):
+            months += 1
+            month_interest = float(interest.sum())
+            total_interest += month_interest
+            line: Dict[str, Any] = {
+                "type": "month",
+                "month_index": months,
+                "total_interest": month_interest,
+                "total_paid": float(payment.sum())
+            }
+            if "months" in fields:
+                principal = [max(0.0, p - i) for p, i in zip(payment.tolist(), interest.tolist())]
+                line["allocations"] = [
+                    {"name": n, "payment": p, "interest_accrued": i, "principal_reduction": pr}
+                    for n, p, i, pr in zip(names, payment.tolist(), interest.tolist(), principal)
+                ]
+            if "balance_series" in fields:
+                line["balance"] = float(balances.sum())
+            yield json.dumps(line) + "\n"
+        
+        yield json.dumps({
+            "type": "summary",
+            "strategy_name": strategy_name,
+            "total_interest_paid": total_interest,
+            "months_to_debt_free": months
+        }) + "\n"
 
     @staticmethod
     async def compare_all_strategies(
         clerk_user_id: str, 
         monthly_budget: float, 
-        max_months: int = 60
+        max_months: int = 60,
+        fields: Optional[Set[str]] = None
     ) -> StrategyComparisonResponse:
         """Generate all three strategies and compare them"""
-        # Get user's debts
-        user_debts = await Debt.find(
-            Debt.clerk_user_id == clerk_user_id,
-            Debt.is_active == True
-        ).to_list()
-        
-        if not user_debts:
-            raise ValueError("No active debts found for user")
+        core_debts = await PlanService._get_core_debts(clerk_user_id)
+        fields = set(PLAN_DETAIL_FIELDS) if fields is None else fields
         
-        # Convert to core debt objects
-        core_debts = [PlanService._convert_db_debt_to_core(debt) for debt in user_debts]
-        
-        # Generate all plans
-        avalanche_plan = compute_avalanche_plan(core_debts, monthly_budget, max_months)
-        snowball_plan = compute_snowball_plan(core_debts, monthly_budget, max_months)
-        optimal_plan = one_step_optimal_allocation(core_debts, monthly_budget)
-        
-        # Convert to responses
-        avalanche_response = PlanService._convert_core_plan_to_response(avalanche_plan, "Debt Avalanche", core_debts)
-        snowball_response = PlanService._convert_core_plan_to_response(snowball_plan, "Debt Snowball", core_debts)
-        optimal_response = PlanService._convert_core_plan_to_response(optimal_plan, "Mathematical Optimal", core_debts)
-        
-        # Determine best strategy (lowest total interest)
-        strategies = [
-            ("avalanche", avalanche_response.total_interest_paid),
-            ("snowball", snowball_response.total_interest_paid),
-            ("optimal", optimal_response.total_interest_paid)
-        ]
-        best_strategy = min(strategies, key=lambda x: x[1])[0]
-        
-        return StrategyComparisonResponse(
-            avalanche=avalanche_response,
-            snowball=snowball_response,
-            optimal=optimal_response,
-            best_strategy=best_strategy
+        cache_key = plan_cache.make_key(
+            "compare", core_debts, monthly_budget=monthly_budget, max_months=max_months, fields=sorted(fields)
         )
+        cached = await plan_cache.get(cache_key, StrategyComparisonResponse)
+        if cached is not None:
+            return cached
+        
+        async def compute() -> StrategyComparisonResponse:
+            # Generate the plans concurrently on the strategy pool, then convert to responses.
+            # The optimal fill is the avalanche order (see core.optimization.compute_optimal_plan),
+            # so it is the avalanche plan under its own label rather than a second identical run.
+            simulated = (StrategyType.AVALANCHE, StrategyType.SNOWBALL)
+            plans = await strategy_executor.run_all({
+                strategy: PlanService._plan_call(core_debts, monthly_budget, max_months, strategy.value, summary_only=not fields)
+                for strategy in simulated
+            })
+            plans[StrategyType.OPTIMAL] = plans[StrategyType.AVALANCHE]
+            strategies = simulated + (StrategyType.OPTIMAL,)
+            avalanche_response, snowball_response, optimal_response = [
+                PlanService._convert_core_plan_to_response(plans[strategy], STRATEGY_NAMES[strategy], fields)
+                for strategy in strategies
+            ]
+            
+            # Determine best strategy (lowest total interest)
+            strategies = [
+                ("avalanche", avalanche_response.total_interest_paid),
+                ("snowball", snowball_response.total_interest_paid),
+                ("optimal", optimal_response.total_interest_paid)
+            ]
+            best_strategy = min(strategies, key=lambda x: x[1])[0]
+            
+            response = StrategyComparisonResponse(
+                avalanche=avalanche_response,
+                snowball=snowball_response,
+                optimal=optimal_response,
+                best_strategy=best_strategy
+            )
+            await plan_cache.set(clerk_user_id, cache_key, response)
+            return response
+        
+        return await single_flight.do(("compare", clerk_user_id, cache_key), compute)
 
     @staticmethod
     async def get_user_debt_summary(clerk_user_id: str) -> Dict[str, Any]:
@@ -181,4 +275,61 @@ class PlanService:
             "debt_count": len(user_debts),
             "available_budget": available_budget,
             "debts": debt_summaries
-        }
\ No newline at end of file
+        }
+
+    @staticmethod
+    async def recompute_all_plans(
+        max_months: int = 60,
+        strategies: tuple = ("avalanche", "snowball"),
+        chunk_size: int = 2048
+    ) -> Dict[str, Any]:
+        """Recompute stored plans for every user with active debts in one batched pass"""
+        # One cursor pass over active debts, grouped per user
+        debts_by_user: Dict[str, List[CoreDebt]] = defaultdict(list)
+        async for debt in Debt.find(Debt.is_active == True):
+            debts_by_user[debt.clerk_user_id].append(PlanService._convert_db_debt_to_core(debt))
+        
+        if not debts_by_user:
+            return {"users": 0, "plans_written": 0}
+        
+        budgets: Dict[str, float] = {}
+        async for user in User.find({"clerk_user_id": {"$in": list(debts_by_user)}}):
+            budgets[user.clerk_user_id] = user.monthly_income - user.monthly_expenses
+        
+        # Similar debt counts share a chunk so padding stays small
+        user_ids = sorted(debts_by_user, key=lambda uid: len(debts_by_user[uid]))
+        now = datetime.utcnow()
+        ops = []
+        
+        for start in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[start:start + chunk_size]
+            balances, aprs, mins = pad_debt_arrays([debts_by_user[uid] for uid in chunk])
+            chunk_budgets = [budgets.get(uid, 0.0) for uid in chunk]
+            
+            for strategy in strategies:
+                summary = simulate_priority_batch(balances, aprs, mins, chunk_budgets, max_months, strategy)
+                for row, uid in enumerate(chunk):
+                    if not summary.valid[row]:
+                        continue
+                    months = int(summary.months_to_debt_free[row])
+                    ops.append(UpdateOne(
+                        {"clerk_user_id": uid, "strategy": strategy, "plan_name": f"Nightly {strategy.title()}"},
+                        {
+                            "$set": {
+                                "monthly_budget": float(chunk_budgets[row]),
+                                "max_months": max_months,
+                                "total_months": months,
+                                "total_interest": float(summary.total_interest[row]),
+                                "total_payments": float(summary.total_paid[row]),
+                                "balance_trajectory": summary.balance_series[row, :months].tolist(),
+                                "updated_at": now
+                            },
+                            "$setOnInsert": {"created_at": now, "is_active": True}
+                        },
+                        upsert=True
+                    ))
+        
+        if ops:
+            await Plan.get_pymongo_collection().bulk_write(ops, ordered=False)
+        
+        return {"users": len(user_ids), "plans_written": len(ops)}
@@ -0,0 +1,140 @@
+# app/services/rag_service.py
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from app.config.settings import settings
+from app.core.hybrid_search import CrossEncoderReranker, load_reranker
+from app.core.vector_index import KBIndex
+from app.services.embedding_client import embedding_client
+from app.services.llm_client import llm_client
+from app.services.llm_cache import llm_cache
+from app.utils.single_flight import single_flight
+
+class KBIndexHandle:
+    """
+    Process-wide handle on the education knowledge-base index. It is loaded once at startup
+    (memory-mapped, so uvicorn workers share the pages) and then only read. Queries are
+    embedded through the pooled embedding client; the hybrid FAISS + BM25 search and the
+    optional reranker run in a worker thread.
+    """
+
+    def __init__(self, index_dir: str, embedding_model: str, candidates: int, reranker_model: str, nprobe: int):
+        self.index_dir = index_dir
+        self.embedding_model = embedding_model
+        self.nprobe = nprobe
+        self.candidates = candidates
+        self.reranker_model = reranker_model
+        self._index: Optional[KBIndex] = None
+        self._reranker: Optional[CrossEncoderReranker] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._index is not None
+
+    def _load(self) -> Optional[KBIndex]:
+        index = KBIndex.load(self.index_dir, embeddings=None, mmap=True, serving=True, nprobe=self.nprobe)
+        if index is None:
+            print(f"No KB index at {self.index_dir}; run build_kb_index.py to enable grounded answers")
+            return None
+        if index.manifest["embedding_model"] != self.embedding_model:
+            print(f"KB index was built with {index.manifest['embedding_model']}, not {self.embedding_model}; ignoring it")
+            return None
+        index.bm25  # build the keyword index now rather than on the first question
+        return index
+
+    async def load(self) -> None:
+        try:
+            self._index = await asyncio.to_thread(self._load)
+        except Exception as e:
+            print(f"KB index load error: {e}")
+            self._index = None
+        if self._index is not None and self._reranker is None:
+            self._reranker = await asyncio.to_thread(load_reranker, self.reranker_model)
+        if self._index is not None:
+            serving = self._index.manifest.get("serving") or {"type": "flat"}
+            print(f"Loaded KB index ({serving['type']}): {self._index.size} chunks from {len(self._index.manifest['files'])} files")
+
+    async def search(self, query: str, k: int) -> List[Tuple[Dict[str, Any], float]]:
+        index = self._index
+        if index is None:
+            raise RuntimeError("Knowledge base index is not loaded")
+        vector = (await embedding_client.embed([query]))[0]
+        return await asyncio.to_thread(index.hybrid_search_by_vector, query, vector, k, self.candidates, self._reranker)
+
+class RAGService:
+
+    SYSTEM_PROMPT = """You are a concise personal-finance tutor for users in India.
+Answer only from the numbered context; cite sources as [n]. Use ₹ for money.
+If the context is not enough, say so briefly."""
+
+    COMPLETION_OPTIONS = {"temperature": 0.2, "max_tokens": settings.RAG_MAX_TOKENS}
+
+    NO_CONTEXT_RESPONSE = "I couldn't find anything in the knowledge base about that. Try rephrasing, or ask in the education chat."
+
+    @staticmethod
+    def _build_context(hits: List[Tuple[Dict[str, Any], float]], max_chars: int) -> Tuple[str, List[Dict[str, Any]]]:
+        """Numbered context blocks within a character budget, and the sources actually used"""
+        blocks, sources, used = [], [], 0
+        for chunk, score in hits:
+            text = chunk["text"].strip()
+            if used + len(text) > max_chars:
+                if blocks:
+                    break
+                text = text[:max_chars]
+            blocks.append(f"[{len(blocks) + 1}] ({chunk['source']}) {text}")
+            sources.append({"ref": len(blocks), "source": chunk["source"], "score": round(score, 4)})
+            used += len(text)
+        return "\n\n".join(blocks), sources
+
+    @staticmethod
+    async def answer_question(question: str, k: Optional[int] = None) -> Dict[str, Any]:
+        question = question.strip()
+        if not question:
+            raise ValueError("Question must not be empty")
+        k = min(max(k or settings.RAG_TOP_K, 1), settings.RAG_MAX_TOP_K)
+
+        hits = await kb_index_handle.search(question, k)
+        if not hits:
+            return {
+                "success": True,
+                "answer": RAGService.NO_CONTEXT_RESPONSE,
+                "sources": [],
+                "timestamp": datetime.utcnow().isoformat()
+            }
+
+        context, sources = RAGService._build_context(hits, settings.RAG_MAX_CONTEXT_CHARS)
+        prompt = f"Context:\n{context}\n\nQuestion: {question}"
+        model = settings.llm_model
+        # KB answers hold no user data, so they are cached and coalesced across users
+        key = llm_cache.make_key(model, RAGService.SYSTEM_PROMPT, prompt, RAGService.COMPLETION_OPTIONS)
+
+        async def complete() -> str:
+            cached = await llm_cache.get(key)
+            if cached is not None:
+                return cached
+            response = await llm_client.chat_completion(
+                [
+                    {"role": "system", "content": RAGService.SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                model=model,
+                **RAGService.COMPLETION_OPTIONS
+            )
+            await llm_cache.set(key, response)
+            return response
+
+        answer = await single_flight.do(("rag", key), complete)
+        return {
+            "success": True,
+            "answer": answer,
+            "sources": sources,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+
+kb_index_handle = KBIndexHandle(
+    index_dir=settings.KB_INDEX_DIR,
+    embedding_model=settings.EMBEDDING_MODEL,
+    candidates=settings.RAG_CANDIDATES,
+    reranker_model=settings.RAG_RERANKER_MODEL,
+    nprobe=settings.RAG_IVF_NPROBE
+)
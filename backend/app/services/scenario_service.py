@@ -1,14 +1,21 @@
+import numpy as np
 from typing import List, Dict, Any
 from app.models.debt import Debt
 from app.models.user import User
-from app.core.schemas import Debt as CoreDebt
-from app.core.optimization import (
-    compute_avalanche_plan,
-    compute_snowball_plan,
-    one_step_optimal_allocation
+from app.core.schemas import Debt as CoreDebt, TimelineEvent
+from app.core.optimization import compute_plan_arrays, compute_plan_summary
+from app.core.array_engine import CLEARED_THRESHOLD, to_repayment_plan
+from app.core.timeline import compare_timeline
+from app.core.scenarios import sweep_budgets
+from app.core.monte_carlo import ShockModel, simulate_paths, merge_path_results, percentile_bands
+from app.config.settings import settings
+from app.schemas.scenario import (
+    WhatIfRequest, ScenarioComparison, ScenarioType,
+    SweepRequest, SweepResponse, SweepPoint,
+    MonteCarloRequest, MonteCarloResponse
 )
-from app.core.plan_utils import simulate_total_balance_series
-from app.schemas.scenario import WhatIfRequest, ScenarioComparison, ScenarioType
+from app.services.plan_cache import plan_cache
+from app.services.strategy_executor import strategy_executor
 
 class ScenarioService:
     @staticmethod
@@ -27,14 +34,15 @@ class ScenarioService:
         )
 
     @staticmethod
-    def _generate_plan(debts: List[CoreDebt], budget: float, months: int, strategy: str):
-        """Generate plan based on strategy"""
-        if strategy == "snowball":
-            return compute_snowball_plan(debts, budget, months)
-        elif strategy == "optimal":
-            return one_step_optimal_allocation(debts, budget)
-        else:  # avalanche
-            return compute_avalanche_plan(debts, budget, months)
+    def _strategy_key(strategy: str) -> str:
+        """Unknown strategies fall back to avalanche"""
+        return strategy if strategy in ("snowball", "optimal") else "avalanche"
+
+    @staticmethod
+    def _summary_call(debts: List[CoreDebt], budget: float, months: int, strategy: str):
+        """Executor call for a plan whose summary numbers are all that is needed"""
+        fn = compute_plan_summary if settings.PLAN_EVENT_ENGINE else compute_plan_arrays
+        return fn, (debts, budget, months, ScenarioService._strategy_key(strategy))
 
     @staticmethod
     async def run_what_if_analysis(
@@ -56,31 +64,30 @@ class ScenarioService:
         baseline_debts = [ScenarioService._convert_db_debt_to_core(debt) for debt in user_debts]
         scenario_debts = [ScenarioService._convert_db_debt_to_core(debt) for debt in user_debts]
         
-        # Generate baseline plan
-        baseline_plan = ScenarioService._generate_plan(
-            baseline_debts,
-            what_if_request.base_budget,
-            what_if_request.analysis_months,
-            what_if_request.base_strategy
-        )
+        cache_key = plan_cache.make_key("what-if", baseline_debts, request=what_if_request.model_dump(mode="json"))
+        cached = await plan_cache.get(cache_key, ScenarioComparison)
+        if cached is not None:
+            return cached
         
-        # Modify scenario based on type
-        scenario_budget = what_if_request.base_budget
+        # Express the scenario type as dated events, then add the request's own timeline
+        base_budget = what_if_request.base_budget
+        events: List[TimelineEvent] = []
         
         if what_if_request.scenario_type == ScenarioType.EXTRA_PAYMENT:
-            scenario_budget += what_if_request.extra_payment or 0
+            events.append(TimelineEvent(kind="budget_change", month=1, amount=what_if_request.extra_payment or 0))
             
         elif what_if_request.scenario_type == ScenarioType.BUDGET_REDUCTION:
-            scenario_budget -= what_if_request.budget_reduction or 0
-            scenario_budget = max(scenario_budget, sum(d.min_payment for d in scenario_debts))
+            reduced_budget = max(base_budget - (what_if_request.budget_reduction or 0), sum(d.min_payment for d in scenario_debts))
+            events.append(TimelineEvent(kind="budget_change", month=1, amount=reduced_budget - base_budget))
             
         elif what_if_request.scenario_type == ScenarioType.INTEREST_RATE_CHANGE:
-            rate_change = (what_if_request.rate_change_percent or 0) / 100
             affected = what_if_request.affected_debts or []
-            
-            for debt in scenario_debts:
-                if not affected or debt.name in affected or "All" in affected:
-                    debt.apr = max(0, debt.apr + rate_change)
+            events.append(TimelineEvent(
+                kind="rate_change",
+                month=1,
+                rate_change_percent=what_if_request.rate_change_percent or 0,
+                debts=[] if "All" in affected else affected
+            ))
                     
         elif what_if_request.scenario_type == ScenarioType.DEBT_CONSOLIDATION:
             total_balance = sum(d.balance for d in scenario_debts)
@@ -95,27 +102,30 @@ class ScenarioService:
             )]
             
         elif what_if_request.scenario_type == ScenarioType.WINDFALL:
-            # Apply windfall to highest APR debt
+            # Windfall lands in windfall_month, highest APR debt first
             windfall = what_if_request.windfall_amount or 0
-            if windfall > 0 and scenario_debts:
-                highest_apr_debt = max(scenario_debts, key=lambda d: d.apr)
-                highest_apr_debt.balance = max(0, highest_apr_debt.balance - windfall)
-        
-        # Generate scenario plan
-        scenario_plan = ScenarioService._generate_plan(
-            scenario_debts,
-            scenario_budget,
-            what_if_request.analysis_months,
-            what_if_request.base_strategy
+            if windfall > 0:
+                events.append(TimelineEvent(kind="windfall", month=what_if_request.windfall_month or 1, amount=windfall))
+        
+        events.extend(
+            TimelineEvent(kind=e.type.value, **e.model_dump(exclude={"type"}))
+            for e in what_if_request.events
+        )
+        
+        # Baseline, then the scenario resumed from the baseline snapshot before its first event
+        baseline_plan, scenario_plan = await strategy_executor.run(
+            compare_timeline,
+            baseline_debts, scenario_debts, base_budget, what_if_request.analysis_months,
+            ScenarioService._strategy_key(what_if_request.base_strategy), events
         )
         
         # Calculate differences
-        baseline_interest = sum(m.total_interest for m in baseline_plan.months)
-        scenario_interest = sum(m.total_interest for m in scenario_plan.months)
-        baseline_months = len(baseline_plan.months)
-        scenario_months = len(scenario_plan.months)
-        baseline_total = sum(m.total_paid for m in baseline_plan.months)
-        scenario_total = sum(m.total_paid for m in scenario_plan.months)
+        baseline_interest = baseline_plan.total_interest_paid
+        scenario_interest = scenario_plan.total_interest_paid
+        baseline_months = baseline_plan.months_to_debt_free
+        scenario_months = scenario_plan.months_to_debt_free
+        baseline_total = baseline_plan.total_paid
+        scenario_total = scenario_plan.total_paid
         
         interest_savings = baseline_interest - scenario_interest
         months_saved = baseline_months - scenario_months
@@ -140,27 +150,162 @@ class ScenarioService:
             roi = (interest_savings / ((what_if_request.extra_payment or 1) * scenario_months)) * 100
             insights.append(f"ROI: Every extra ₹1 saves ₹{interest_savings/((what_if_request.extra_payment or 1) * scenario_months):.2f}")
             
-        # Prepare response data
-        baseline_balance_series = simulate_total_balance_series(baseline_debts, baseline_plan)
-        scenario_balance_series = simulate_total_balance_series(scenario_debts, scenario_plan)
+        # Prepare response data (trajectories were recorded while simulating)
+        baseline_full = to_repayment_plan(baseline_plan)
+        scenario_full = to_repayment_plan(scenario_plan)
         
-        return ScenarioComparison(
+        response = ScenarioComparison(
             baseline={
                 "months": baseline_months,
                 "total_interest": baseline_interest,
                 "total_payments": baseline_total,
-                "balance_series": baseline_balance_series,
-                "plan": baseline_plan
+                "balance_series": baseline_full.balance_series,
+                "plan": baseline_full
             },
             scenario={
                 "months": scenario_months,
                 "total_interest": scenario_interest,
                 "total_payments": scenario_total,
-                "balance_series": scenario_balance_series,
-                "plan": scenario_plan
+                "balance_series": scenario_full.balance_series,
+                "plan": scenario_full
             },
             interest_savings=interest_savings,
             months_saved=months_saved,
             payment_difference=payment_difference,
             insights=insights
-        )
\ No newline at end of file
+        )
+        await plan_cache.set(clerk_user_id, cache_key, response)
+        return response
+
+    @staticmethod
+    async def run_sensitivity_sweep(
+        clerk_user_id: str,
+        sweep_request: SweepRequest
+    ) -> SweepResponse:
+        """Payoff months and interest for a grid of budgets, simulated as one batch"""
+        user_debts = await Debt.find(
+            Debt.clerk_user_id == clerk_user_id,
+            Debt.is_active == True
+        ).to_list()
+        
+        if not user_debts:
+            raise ValueError("No active debts found for user")
+        
+        core_debts = [ScenarioService._convert_db_debt_to_core(debt) for debt in user_debts]
+        
+        cache_key = plan_cache.make_key("sweep", core_debts, request=sweep_request.model_dump(mode="json"))
+        cached = await plan_cache.get(cache_key, SweepResponse)
+        if cached is not None:
+            return cached
+        
+        base_budget = sweep_request.base_budget
+        if sweep_request.extra_payments:
+            grid = [base_budget + extra for extra in sweep_request.extra_payments]
+        else:
+            points = int((sweep_request.budget_max - sweep_request.budget_min) // sweep_request.budget_step) + 1
+            grid = [sweep_request.budget_min + i * sweep_request.budget_step for i in range(points)]
+        
+        # Row 0 is the baseline; every grid point is compared against it
+        strategy = ScenarioService._strategy_key(sweep_request.base_strategy)
+        budgets = [base_budget] + grid
+        summary = await strategy_executor.run(sweep_budgets, core_debts, budgets, sweep_request.analysis_months, strategy)
+        
+        def point(row: int) -> Dict[str, Any]:
+            months = int(summary.months_to_debt_free[row])
+            feasible = bool(summary.valid[row])
+            if months > 0:
+                debt_free = bool(summary.balance_series[row, months - 1] <= CLEARED_THRESHOLD)
+            else:
+                debt_free = feasible and all(d.balance <= CLEARED_THRESHOLD for d in core_debts)
+            return {
+                "monthly_budget": budgets[row],
+                "extra_payment": budgets[row] - base_budget,
+                "feasible": feasible,
+                "debt_free": debt_free,
+                "months_to_debt_free": months,
+                "total_interest": float(summary.total_interest[row]),
+                "total_payments": float(summary.total_paid[row])
+            }
+        
+        baseline = point(0)
+        points = []
+        for row in range(1, len(budgets)):
+            p = point(row)
+            p["months_saved"] = baseline["months_to_debt_free"] - p["months_to_debt_free"]
+            p["interest_savings"] = baseline["total_interest"] - p["total_interest"]
+            points.append(SweepPoint(**p))
+        
+        response = SweepResponse(
+            strategy=strategy,
+            baseline=SweepPoint(**baseline, months_saved=0, interest_savings=0.0),
+            points=points
+        )
+        await plan_cache.set(clerk_user_id, cache_key, response)
+        return response
+
+    @staticmethod
+    async def run_monte_carlo(
+        clerk_user_id: str,
+        mc_request: MonteCarloRequest
+    ) -> MonteCarloResponse:
+        """Percentile bands for payoff month and interest under random rate, payment and income shocks"""
+        user_debts = await Debt.find(
+            Debt.clerk_user_id == clerk_user_id,
+            Debt.is_active == True
+        ).to_list()
+        
+        if not user_debts:
+            raise ValueError("No active debts found for user")
+        
+        core_debts = [ScenarioService._convert_db_debt_to_core(debt) for debt in user_debts]
+        min_total = sum(d.min_payment for d in core_debts if d.balance > 0)
+        if mc_request.base_budget < min_total:
+            raise ValueError(f"Base budget (₹{mc_request.base_budget:,.0f}) is less than total minimum payments (₹{min_total:,.0f})")
+        
+        # Unseeded runs are random by design, so only seeded ones are worth caching
+        cache_key = None
+        if mc_request.seed is not None:
+            cache_key = plan_cache.make_key("monte-carlo", core_debts, request=mc_request.model_dump(mode="json"))
+            cached = await plan_cache.get(cache_key, MonteCarloResponse)
+            if cached is not None:
+                return cached
+        
+        strategy = ScenarioService._strategy_key(mc_request.base_strategy)
+        shocks = ShockModel(
+            apr_shock_std=mc_request.apr_shock_std_percent / 100,
+            missed_payment_prob=mc_request.missed_payment_prob,
+            income_drop_prob=mc_request.income_drop_prob,
+            income_drop_fraction=mc_request.income_drop_percent / 100,
+            income_drop_months=mc_request.income_drop_months
+        )
+        
+        # Independent chunks with their own seeds, spread over the strategy pool with the baseline
+        chunk = max(1, settings.MONTE_CARLO_CHUNK_PATHS)
+        sizes = [min(chunk, mc_request.n_paths - start) for start in range(0, mc_request.n_paths, chunk)]
+        seeds = np.random.SeedSequence(mc_request.seed).generate_state(len(sizes))
+        calls = {
+            f"paths_{i}": (simulate_paths, (core_debts, mc_request.base_budget, mc_request.analysis_months, strategy, size, shocks, int(seed)))
+            for i, (size, seed) in enumerate(zip(sizes, seeds))
+        }
+        calls["baseline"] = ScenarioService._summary_call(
+            core_debts, mc_request.base_budget, mc_request.analysis_months, strategy
+        )
+        results = await strategy_executor.run_all(calls)
+        
+        baseline_plan = results.pop("baseline")
+        paths = merge_path_results(list(results.values()))
+        
+        response = MonteCarloResponse(
+            strategy=strategy,
+            n_paths=mc_request.n_paths,
+            baseline={
+                "months": baseline_plan.months_to_debt_free,
+                "total_interest": baseline_plan.total_interest_paid
+            },
+            months_to_debt_free=percentile_bands(paths.months_to_debt_free),
+            total_interest=percentile_bands(paths.total_interest),
+            probability_debt_free=float(paths.debt_free.mean())
+        )
+        if cache_key is not None:
+            await plan_cache.set(clerk_user_id, cache_key, response)
+        return response
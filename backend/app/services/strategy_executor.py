@@ -0,0 +1,97 @@
+# app/services/strategy_executor.py
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional, Tuple
+from app.config.settings import settings
+
+class ExecutorSaturatedError(RuntimeError):
+    """Raised when the strategy pool already has its maximum number of simulations queued"""
+
+def _warm_up() -> None:
+    # runs once per worker so the engine modules are imported before the first real request
+    import app.core.optimization  # noqa: F401
+
+class StrategyExecutor:
+    """
+    Runs CPU-bound plan simulations off the event loop on a bounded pool.
+
+    At most `max_pending` simulations may be queued or running at once; beyond that, callers get
+    ExecutorSaturatedError immediately instead of piling up behind a busy pool. Each call is
+    bounded by `timeout_seconds`. A timed-out simulation still finishes in its worker, but the
+    request stops waiting for it.
+    """
+
+    def __init__(self, kind: str, max_workers: int, max_pending: int, timeout_seconds: float):
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout_seconds = timeout_seconds
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                # spawn: forking a process that already runs motor/uvicorn threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="strategy")
+        return self._executor
+
+    def start(self) -> None:
+        """Create the pool and start its workers ahead of the first request"""
+        for _ in range(self.max_workers):
+            self.executor.submit(_warm_up)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._pending = 0
+
+    async def run(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        """Run fn(*args, **kwargs) on the pool; fn and its arguments must be picklable for the process pool"""
+        results = await self.run_all({"result": (partial(fn, **kwargs) if kwargs else fn, args)}, timeout=timeout)
+        return results["result"]
+
+    async def run_all(self, calls: Dict[str, Tuple[Callable[..., Any], tuple]], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Run several independent calls concurrently under one deadline; returns results by name"""
+        if self._pending + len(calls) > self.max_pending:
+            raise ExecutorSaturatedError("Plan computation is busy, please retry shortly")
+
+        loop = asyncio.get_running_loop()
+        futures = []
+        for fn, args in calls.values():
+            future = self.executor.submit(fn, *args)
+            # a slot is only freed when the worker is really done, even if the caller gave up waiting
+            self._pending += 1
+            future.add_done_callback(partial(self._release, loop))
+            futures.append(asyncio.wrap_future(future))
+
+        # on timeout wait_for cancels the gather, which also drops calls still queued in the pool
+        results = await asyncio.wait_for(
+            asyncio.gather(*futures),
+            timeout=self.timeout_seconds if timeout is None else timeout
+        )
+        return dict(zip(calls.keys(), results))
+
+    def _release(self, loop: asyncio.AbstractEventLoop, _future) -> None:
+        # called from the pool's thread; counters are only touched on the event loop
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(self._decrement)
+
+    def _decrement(self) -> None:
+        self._pending = max(0, self._pending - 1)
+
+strategy_executor = StrategyExecutor(
+    kind=settings.STRATEGY_EXECUTOR_KIND,
+    max_workers=settings.STRATEGY_EXECUTOR_WORKERS,
+    max_pending=settings.STRATEGY_EXECUTOR_MAX_PENDING,
+    timeout_seconds=settings.STRATEGY_TIMEOUT_SECONDS
+)
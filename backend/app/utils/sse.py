@@ -0,0 +1,12 @@
+# app/utils/sse.py
+import json
+from typing import Any, Dict
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",  # stop nginx-style proxies from buffering the stream
+}
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """One server-sent event frame with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
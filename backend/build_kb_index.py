@@ -0,0 +1,27 @@
+import argparse
+import time
+from app.config.settings import settings
+from app.core.education import ingest_knowledge_base
+from app.core.vector_index import INDEX_TYPES
+
+def build_kb_index(kb_dir: str, index_dir: str, index_type: str, retrain: bool):
+    started = time.perf_counter()
+    report = ingest_knowledge_base(kb_dir, index_dir, index_type=index_type, retrain=retrain)
+    print(
+        f"KB index {index_dir}: {len(report.added)} added, {len(report.updated)} updated, "
+        f"{len(report.removed)} removed, {report.unchanged} unchanged, "
+        f"{report.chunks_embedded} chunks embedded{' (full rebuild)' if report.rebuilt else ''} "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+    if report.serving_index:
+        entry = report.serving_index
+        print(f"Trained {entry['type']} serving index over {entry['vectors']} vectors (nlist={entry['nlist']}, pq_m={entry['pq_m']})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incrementally embed the education knowledge base and train its serving index")
+    parser.add_argument("--kb-dir", default=settings.KB_DIR)
+    parser.add_argument("--index-dir", default=settings.KB_INDEX_DIR)
+    parser.add_argument("--index-type", default=settings.KB_INDEX_TYPE, choices=list(INDEX_TYPES))
+    parser.add_argument("--retrain", action="store_true", help="retrain the serving index even if it is up to date")
+    args = parser.parse_args()
+    build_kb_index(args.kb_dir, args.index_dir, args.index_type, args.retrain)
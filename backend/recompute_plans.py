@@ -0,0 +1,16 @@
+import asyncio
+import time
+from app.config.database import init_database, close_database
+from app.services.plan_service import PlanService
+
+async def recompute_plans():
+    await init_database()
+    
+    started = time.perf_counter()
+    result = await PlanService.recompute_all_plans()
+    print(f"Recomputed plans for {result['users']} users ({result['plans_written']} plans written) in {time.perf_counter() - started:.1f}s")
+    
+    await close_database()
+
+if __name__ == "__main__":
+    asyncio.run(recompute_plans())
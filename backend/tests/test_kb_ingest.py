@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import httpx
+import numpy as np
+import pytest
+from app.core.kb_embedding import BatchedOllamaEmbeddings, EmbeddingCache
+from app.core.vector_index import MANIFEST_FILE, file_sha256, ingest_kb
+
+DIMENSION = 8
+
+class StubEmbedServer:
+    """Stand-in for Ollama's /api/embed: deterministic vectors per text, records each batch size"""
+
+    def __init__(self):
+        self.batches = []
+
+    def vector(self, text: str):
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        return [b / 255.0 + 0.01 for b in digest[:DIMENSION]]
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/api/embed"
+        body = json.loads(request.content)
+        self.batches.append(len(body["input"]))
+        return httpx.Response(200, json={"embeddings": [self.vector(t) for t in body["input"]]})
+
+@pytest.fixture
+def server():
+    return StubEmbedServer()
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache" / "embeddings.sqlite"))
+    yield cache
+    cache.close()
+
+def make_embedder(server: StubEmbedServer, cache=None, batch_size: int = 4) -> BatchedOllamaEmbeddings:
+    return BatchedOllamaEmbeddings(
+        base_url="http://ollama.test", model="stub-embed", batch_size=batch_size, concurrency=2,
+        cache=cache, transport=httpx.MockTransport(server.handler)
+    )
+
+def write_kb(kb_dir, files):
+    for rel_path, text in files.items():
+        path = kb_dir / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+
+def test_embed_many_batches_unique_texts(server, cache):
+    texts = [f"chunk {i}" for i in range(9)] + ["chunk 0"]
+    embedder = make_embedder(server, cache, batch_size=4)
+    vectors = embedder.embed_many(texts)
+    embedder.close()
+
+    assert sorted(server.batches) == [1, 4, 4]
+    assert embedder.requests_sent == 3
+    assert vectors.shape == (10, DIMENSION)
+    np.testing.assert_allclose(vectors[0], server.vector("chunk 0"), rtol=1e-6)
+    np.testing.assert_array_equal(vectors[9], vectors[0])
+    assert len(cache) == 9
+
+def test_second_run_is_served_from_cache(server, cache):
+    texts = [f"chunk {i}" for i in range(10)]
+    first = make_embedder(server, cache)
+    expected = first.embed_many(texts)
+    first.close()
+
+    second = make_embedder(server, cache)
+    again = second.embed_many(texts)
+    second.close()
+    assert second.requests_sent == 0
+    np.testing.assert_array_equal(again, expected)
+
+def test_ingest_manifest_tracks_added_updated_removed(tmp_path, server, cache):
+    kb_dir, index_dir = tmp_path / "kb", tmp_path / "index"
+    write_kb(kb_dir, {
+        "credit.md": "Pay the card with the highest APR first. " * 20,
+        "emi.txt": "An EMI is a fixed monthly instalment. " * 20,
+        "notes/cibil.md": "A CIBIL score above 750 is considered good. " * 20,
+        "ignored.pdf": "not a KB file",
+    })
+    embedder = make_embedder(server, cache)
+
+    kb, report = ingest_kb(str(kb_dir), str(index_dir), embedder, "stub-embed", chunk_size=200, chunk_overlap=20)
+    assert sorted(report.added) == ["credit.md", "emi.txt", os.path.join("notes", "cibil.md")]
+    assert report.updated == [] and report.removed == [] and not report.rebuilt
+    assert report.chunks_embedded == kb.size > 3
+
+    # nothing changed: no embedding work and nothing reported
+    requests = embedder.requests_sent
+    kb, report = ingest_kb(str(kb_dir), str(index_dir), embedder, "stub-embed", chunk_size=200, chunk_overlap=20)
+    assert not report.changed and report.unchanged == 3
+    assert embedder.requests_sent == requests
+
+    write_kb(kb_dir, {"emi.txt": "EMIs are due on the same date every month. " * 20, "loans.md": "Prepay the costliest loan. " * 20})
+    os.remove(kb_dir / "credit.md")
+    kb, report = ingest_kb(str(kb_dir), str(index_dir), embedder, "stub-embed", chunk_size=200, chunk_overlap=20)
+    assert report.added == ["loans.md"]
+    assert report.updated == ["emi.txt"]
+    assert report.removed == ["credit.md"]
+    assert report.unchanged == 1
+
+    with open(index_dir / MANIFEST_FILE, encoding="utf-8") as f:
+        manifest = json.load(f)
+    assert sorted(manifest["files"]) == ["emi.txt", "loans.md", os.path.join("notes", "cibil.md")]
+    assert manifest["files"]["emi.txt"]["sha256"] == file_sha256(str(kb_dir / "emi.txt"))
+    assert {c["path"] for c in kb.chunks.values()} == set(manifest["files"])
+    embedder.close()
+
+def test_rebuilt_index_reuses_cached_vectors(tmp_path, server, cache):
+    kb_dir = tmp_path / "kb"
+    write_kb(kb_dir, {f"doc{i}.md": f"Document {i} about budgeting. " * 30 for i in range(5)})
+    first = make_embedder(server, cache)
+    kb, _ = ingest_kb(str(kb_dir), str(tmp_path / "index_a"), first, "stub-embed", chunk_size=200, chunk_overlap=20)
+    first.close()
+
+    # a fresh index directory re-adds every file, but every vector comes from the cache
+    second = make_embedder(server, cache)
+    rebuilt, report = ingest_kb(str(kb_dir), str(tmp_path / "index_b"), second, "stub-embed", chunk_size=200, chunk_overlap=20)
+    second.close()
+    assert len(report.added) == 5
+    assert second.requests_sent == 0
+    assert rebuilt.size == kb.size
@@ -0,0 +1,120 @@
+import asyncio
+import json
+import httpx
+import pytest
+from app.services.llm_client import LLMClient, LLMClientError
+
+def make_client(handler, max_retries: int = 2) -> LLMClient:
+    return LLMClient(
+        base_url="http://llm.test/v1",
+        api_key="test-key",
+        timeout_seconds=5.0,
+        connect_timeout_seconds=1.0,
+        max_connections=4,
+        max_keepalive_connections=2,
+        keepalive_expiry_seconds=5.0,
+        http2=False,
+        max_retries=max_retries,
+        backoff_seconds=0.0,
+        backoff_max_seconds=0.0,
+        transport=httpx.MockTransport(handler)
+    )
+
+def completion(content: str) -> httpx.Response:
+    return httpx.Response(200, json={"choices": [{"message": {"role": "assistant", "content": content}}]})
+
+def sse(*events: str) -> bytes:
+    return "".join(f"data: {e}\n\n" for e in events).encode("utf-8")
+
+def delta(content: str) -> str:
+    return json.dumps({"choices": [{"delta": {"content": content}}]})
+
+def replay(responses):
+    """Handler that answers with `responses` in order and records every request it saw"""
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        response = responses[len(seen) - 1]
+        if isinstance(response, Exception):
+            raise response
+        return response
+    return handler, seen
+
+def run(client: LLMClient, coro):
+    async def main():
+        try:
+            return await coro
+        finally:
+            await client.close()
+    return asyncio.run(main())
+
+def collect(client: LLMClient, **kwargs):
+    async def main():
+        return [d async for d in client.stream_chat_completion([{"role": "user", "content": "hi"}], model="m", **kwargs)]
+    return run(client, main())
+
+def test_chat_completion_sends_the_request():
+    handler, seen = replay([completion("hello")])
+    client = make_client(handler)
+    answer = run(client, client.chat_completion([{"role": "user", "content": "hi"}], model="m", max_tokens=10))
+    assert answer == "hello"
+    assert seen[0].url.path == "/v1/chat/completions"
+    assert seen[0].headers["authorization"] == "Bearer test-key"
+    body = json.loads(seen[0].content)
+    assert body["model"] == "m" and body["max_tokens"] == 10 and "stream" not in body
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_retries_retryable_statuses(status):
+    handler, seen = replay([httpx.Response(status, headers={"retry-after": "0"}), httpx.Response(status), completion("ok")])
+    client = make_client(handler)
+    assert run(client, client.chat_completion([], model="m")) == "ok"
+    assert len(seen) == 3
+
+def test_retries_transport_errors():
+    handler, seen = replay([httpx.ConnectError("refused"), completion("ok")])
+    client = make_client(handler)
+    assert run(client, client.chat_completion([], model="m")) == "ok"
+    assert len(seen) == 2
+
+def test_gives_up_after_max_retries():
+    handler, seen = replay([httpx.Response(503, text="busy")] * 5)
+    client = make_client(handler, max_retries=2)
+    with pytest.raises(LLMClientError) as excinfo:
+        run(client, client.chat_completion([], model="m"))
+    assert excinfo.value.status_code == 503
+    assert len(seen) == 3
+
+def test_does_not_retry_client_errors():
+    handler, seen = replay([httpx.Response(400, text="bad request"), completion("never")])
+    client = make_client(handler)
+    with pytest.raises(LLMClientError) as excinfo:
+        run(client, client.chat_completion([], model="m"))
+    assert excinfo.value.status_code == 400
+    assert len(seen) == 1
+
+def test_stream_yields_deltas_in_order():
+    body = (
+        b": keep-alive comment\n\n"
+        + sse(json.dumps({"choices": [{"delta": {"role": "assistant"}}]}), delta("Pay "), delta("the "), delta("card"))
+        + sse(json.dumps({"choices": []}), delta(" first."), "[DONE]", delta("after done"))
+    )
+    handler, seen = replay([httpx.Response(200, content=body, headers={"content-type": "text/event-stream"})])
+    assert collect(make_client(handler)) == ["Pay ", "the ", "card", " first."]
+    assert json.loads(seen[0].content)["stream"] is True
+
+def test_stream_retries_before_the_first_delta():
+    handler, seen = replay([
+        httpx.Response(429),
+        httpx.ConnectError("reset"),
+        httpx.Response(200, content=sse(delta("a"), delta("b"), "[DONE]"))
+    ])
+    assert collect(make_client(handler)) == ["a", "b"]
+    assert len(seen) == 3
+
+def test_stream_gives_up_after_max_retries():
+    handler, seen = replay([httpx.Response(502)] * 3)
+    with pytest.raises(LLMClientError) as excinfo:
+        collect(make_client(handler, max_retries=1))
+    assert excinfo.value.status_code == 502
+    assert len(seen) == 2
@@ -0,0 +1,176 @@
+import random
+import numpy as np
+import pytest
+from app.core.schemas import Debt
+from app.core.amortization import interest_for_fixed_payment, simulate_fixed_payment
+from app.core.array_engine import simulate_priority_plan
+from app.core.event_engine import simulate_priority_events
+from app.core.optimization import (
+    compute_avalanche_plan, compute_snowball_plan, compute_optimal_plan, compute_plan_arrays, compute_plan_summary
+)
+
+PRIORITY_KEYS = {
+    "avalanche": lambda d: (-d.apr, d.balance),
+    "snowball": lambda d: (d.balance, -d.apr),
+}
+
+def baseline_plan(debts, budget, max_months, strategy):
+    """
+    The original per-month loop (before the NumPy engine): (payments per month, interest per month).
+    Like the engine, balances at or below 0.01 count as paid off and are snapped to zero.
+    """
+    ds = [Debt(**d.model_dump()) for d in debts]
+    payments, interests = [], []
+    mi = 0
+    while mi < max_months and not all(d.balance <= 0.01 for d in ds):
+        remaining = max(0.0, budget - sum(d.min_payment for d in ds if d.balance > 0.01))
+        pay = {}
+        for d in ds:
+            if d.balance > 0.01:
+                pay[d.name] = min(d.balance + d.balance * max(0.0, d.apr) / 12.0, d.min_payment)
+            else:
+                pay[d.name] = 0.0
+        for d in sorted(ds, key=PRIORITY_KEYS[strategy]):
+            if remaining <= 0:
+                break
+            if d.balance <= 0.01:
+                continue
+            due = max(0.0, d.balance + d.balance * max(0.0, d.apr) / 12.0 - pay[d.name])
+            extra = min(remaining, due)
+            pay[d.name] += extra
+            remaining -= extra
+        payments.append([pay[d.name] for d in ds])
+        interests.append([d.balance * max(0.0, d.apr) / 12.0 if d.balance > 0.01 else 0.0 for d in ds])
+        for d in ds:
+            if d.balance <= 0.01:
+                d.balance = 0.0
+                continue
+            due = d.balance + d.balance * max(0.0, d.apr) / 12.0
+            d.balance = max(0.0, due - min(max(0.0, pay[d.name]), due))
+            if d.balance <= 0.01:
+                d.balance = 0.0
+        mi += 1
+    return np.asarray(payments).reshape(mi, len(ds)), np.asarray(interests).reshape(mi, len(ds))
+
+def random_debts(rng: random.Random):
+    debts = []
+    for i in range(rng.randint(1, 7)):
+        balance = rng.choice([0.0, rng.uniform(100, 500000)])
+        debts.append(Debt(
+            name=f"debt{i}",
+            balance=balance,
+            apr=rng.choice([0.0, 0.12, 0.18, rng.uniform(0, 0.45)]),
+            min_payment=round(balance * rng.uniform(0.005, 0.05), 2)
+        ))
+    budget = sum(d.min_payment for d in debts) * rng.uniform(1.0, 2.5) + rng.choice([0.0, rng.uniform(0, 5000)])
+    return debts, budget
+
+@pytest.mark.parametrize("strategy", ["avalanche", "snowball"])
+@pytest.mark.parametrize("seed", range(20))
+def test_array_engine_matches_baseline_loop(strategy, seed):
+    rng = random.Random(seed)
+    for _ in range(25):
+        debts, budget = random_debts(rng)
+        max_months = rng.choice([1, 12, 120, 600])
+        payment, interest = baseline_plan(debts, budget, max_months, strategy)
+        arrays = simulate_priority_plan(debts, budget, max_months, strategy)
+
+        assert arrays.months_to_debt_free == len(payment)
+        np.testing.assert_allclose(arrays.payment, payment, rtol=1e-9, atol=1e-6)
+        np.testing.assert_allclose(arrays.interest, interest, rtol=1e-9, atol=1e-6)
+        assert arrays.total_interest_paid == pytest.approx(interest.sum(), rel=1e-9, abs=1e-6)
+
+def test_public_plans_use_the_array_engine():
+    debts, budget = random_debts(random.Random(7))
+    for compute, strategy in ((compute_avalanche_plan, "avalanche"), (compute_snowball_plan, "snowball")):
+        plan = compute(debts, budget, 360)
+        payment, interest = baseline_plan(debts, budget, 360, strategy)
+        assert plan.months_to_debt_free == len(payment)
+        assert plan.total_interest_paid == pytest.approx(interest.sum(), rel=1e-9, abs=1e-6)
+
+def test_optimal_plan_is_the_avalanche_schedule():
+    # /compare relies on this to reuse the avalanche run for the optimal field
+    rng = random.Random(5)
+    for _ in range(50):
+        debts, budget = random_debts(rng)
+        optimal = compute_optimal_plan(debts, budget, 360)
+        avalanche = compute_avalanche_plan(debts, budget, 360)
+        assert optimal.months == avalanche.months
+        assert optimal.total_interest_paid == avalanche.total_interest_paid
+
+def test_invalid_budget_gives_empty_plan():
+    debts = [Debt(name="card", balance=10000, apr=0.36, min_payment=500)]
+    plan = compute_avalanche_plan(debts, 100, 60)
+    assert plan.months_to_debt_free == 0
+    assert plan.months == []
+
+@pytest.mark.parametrize("seed", range(10))
+def test_closed_form_interest_matches_simulation(seed):
+    rng = random.Random(seed)
+    for _ in range(200):
+        balance = rng.choice([0.0, 0.005, rng.uniform(1, 1000000)])
+        apr = rng.choice([0.0, rng.uniform(0, 0.5)])
+        interest = balance * apr / 12.0
+        payment = rng.choice([interest, interest * 0.5, interest + rng.uniform(1, 50000), rng.uniform(1, 5000)])
+        months = rng.choice([0, 1, 12, 360, 1200])
+        expected_interest, expected_months = simulate_fixed_payment(balance, apr, payment, months)
+        got_interest, got_months = interest_for_fixed_payment(balance, apr, payment, months)
+        assert got_months == expected_months
+        assert got_interest == pytest.approx(expected_interest, rel=1e-7, abs=1e-4)
+
+def edge_case_debts(rng: random.Random):
+    # ties in APR and balance, sub-threshold balances, zero/tiny minimums and budgets at the minimums
+    debts = []
+    for i in range(rng.randint(1, 6)):
+        balance = rng.choice([0.0, 0.005, 1000.0, 5000.0, rng.uniform(1, 20000)])
+        debts.append(Debt(
+            name=f"debt{i}",
+            balance=balance,
+            apr=rng.choice([0.0, 0.12, 0.24]),
+            min_payment=rng.choice([0.0, 1.0, 50.0, round(balance * 0.03, 2)])
+        ))
+    min_total = sum(d.min_payment for d in debts if d.balance > 0.01)
+    return debts, rng.choice([min_total, min_total + rng.uniform(0, 2000), min_total + 1000.0])
+
+@pytest.mark.parametrize("strategy", ["avalanche", "snowball", "optimal"])
+@pytest.mark.parametrize("generator", [random_debts, edge_case_debts])
+@pytest.mark.parametrize("seed", range(10))
+def test_event_engine_matches_monthly_engine(strategy, generator, seed):
+    rng = random.Random(seed)
+    for _ in range(30):
+        debts, budget = generator(rng)
+        max_months = rng.choice([1, 12, 120, 600])
+        full = compute_plan_arrays(debts, budget, max_months, strategy)
+        lazy = compute_plan_summary(debts, budget, max_months, strategy)
+
+        assert lazy.months_to_debt_free == full.months_to_debt_free
+        assert lazy.total_interest_paid == pytest.approx(full.total_interest_paid, rel=1e-7, abs=1e-4)
+        assert lazy.total_paid == pytest.approx(full.total_paid, rel=1e-7, abs=1e-4)
+        arrays = lazy.to_arrays()
+        for field in ("payment", "interest", "balances"):
+            np.testing.assert_allclose(getattr(arrays, field), getattr(full, field), rtol=1e-7, atol=1e-4)
+
+def test_event_engine_skips_steady_months():
+    debts = [Debt(name=f"debt{i}", balance=100000 * (i + 1), apr=0.1 + 0.05 * i, min_payment=2000 * (i + 1)) for i in range(4)]
+    lazy = simulate_priority_events(debts, 25000, 600, "avalanche")
+    assert lazy.months_to_debt_free > 20
+    assert len(lazy.segments) < lazy.months_to_debt_free / 3
+
+def test_lazy_public_plans_build_the_schedule_on_demand():
+    debts, budget = random_debts(random.Random(9))
+    for compute in (compute_avalanche_plan, compute_snowball_plan, compute_optimal_plan):
+        plan, lazy = compute(debts, budget, 360), compute(debts, budget, 360, lazy=True)
+        assert lazy.months_to_debt_free == plan.months_to_debt_free
+        assert lazy.total_interest_paid == pytest.approx(plan.total_interest_paid, rel=1e-7, abs=1e-4)
+        assert len(lazy.months) == len(plan.months)
+
+def test_paid_off_debt_releases_its_minimum():
+    # the first debt clears in month 2; from then on its minimum must go to the other debt
+    debts = [
+        Debt(name="small", balance=1500, apr=0.3, min_payment=1000),
+        Debt(name="large", balance=50000, apr=0.1, min_payment=1000),
+    ]
+    plan = compute_plan_arrays(debts, 3000, 60, "avalanche")
+    assert plan.balances[1, 0] == 0.0
+    assert np.allclose(plan.payment[:-1].sum(axis=1), 3000)
+    assert np.all(plan.payment[2:, 0] == 0.0)
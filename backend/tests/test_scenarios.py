@@ -0,0 +1,48 @@
+import random
+import numpy as np
+import pytest
+from app.core.schemas import TimelineEvent
+from app.core.optimization import compute_plan_arrays
+from app.core.timeline import simulate_timeline, compare_timeline
+from tests.test_plans import random_debts
+
+def random_events(debts, rng: random.Random):
+    names = [d.name for d in debts]
+    events = []
+    for _ in range(rng.randint(1, 4)):
+        kind = rng.choice(["windfall", "rate_change", "budget_change"])
+        month = rng.randint(1, 60)
+        targets = rng.sample(names, rng.randint(0, len(names)))
+        if kind == "windfall":
+            events.append(TimelineEvent(kind=kind, month=month, amount=rng.uniform(0, 200000), debts=targets))
+        elif kind == "rate_change":
+            events.append(TimelineEvent(kind=kind, month=month, rate_change_percent=rng.uniform(-5, 5), debts=targets))
+        else:
+            end = rng.choice([None, month + rng.randint(0, 24)])
+            events.append(TimelineEvent(kind=kind, month=month, end_month=end, amount=rng.uniform(-500, 5000)))
+    return events
+
+@pytest.mark.parametrize("strategy", ["avalanche", "snowball"])
+@pytest.mark.parametrize("seed", range(10))
+def test_timeline_resume_matches_full_run(strategy, seed):
+    rng = random.Random(seed)
+    for _ in range(20):
+        debts, budget = random_debts(rng)
+        max_months = rng.choice([12, 120, 600])
+        events = random_events(debts, rng)
+
+        baseline, scenario = compare_timeline(debts, debts, budget, max_months, strategy, events)
+        full = simulate_timeline(debts, budget, max_months, strategy, events)
+        assert scenario.months_to_debt_free == full.months_to_debt_free
+        for field in ("payment", "interest", "principal", "balances"):
+            np.testing.assert_allclose(getattr(scenario, field), getattr(full, field), rtol=1e-12, atol=1e-9)
+
+@pytest.mark.parametrize("strategy", ["avalanche", "snowball"])
+def test_timeline_without_events_is_the_plain_plan(strategy):
+    rng = random.Random(11)
+    for _ in range(20):
+        debts, budget = random_debts(rng)
+        plan = compute_plan_arrays(debts, budget, 360, strategy)
+        timeline = simulate_timeline(debts, budget, 360, strategy, [])
+        np.testing.assert_allclose(timeline.payment, plan.payment, rtol=1e-12, atol=1e-9)
+        np.testing.assert_allclose(timeline.balances, plan.balances, rtol=1e-12, atol=1e-9)